@@ -0,0 +1,47 @@
+"""Composite covering index for leaderboard reads
+
+Adds ix_scores_leaderboard on
+    (project_id, value DESC, created_at DESC, id DESC) INCLUDE (username)
+
+The key matches the leaderboard ORDER BY (id is the final tie-breaker), and
+INCLUDE (username) lets PostgreSQL answer the top-N with an index-only scan.
+
+On PostgreSQL the index is built CONCURRENTLY so existing tables are not
+locked against score writes while it builds.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_scores_leaderboard",
+            "scores",
+            ["project_id", sa.text("value DESC"), sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_include=["username"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_scores_leaderboard",
+            table_name="scores",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,64 @@
+"""Materialized best score per player (best_scores)
+
+Creates best_scores, one row per (project_id, username), plus its leaderboard
+covering index, and backfills it from the existing score history.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "best_scores",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id"), nullable=False),
+        sa.Column("username", sa.String(length=50), nullable=False),
+        sa.Column("value", sa.Integer(), nullable=False),
+        sa.Column("score_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint("project_id", "username", name="uq_best_scores_project_username"),
+    )
+
+    # The first submission that reached a player's best value wins ties,
+    # matching the upsert-if-greater done by the write path.
+    op.execute(
+        """
+        INSERT INTO best_scores (project_id, username, value, score_id, created_at)
+        SELECT project_id, username, value, id, created_at
+        FROM (
+            SELECT project_id, username, value, id, created_at,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY project_id, username
+                       ORDER BY value DESC, created_at ASC, id ASC
+                   ) AS rn
+            FROM scores
+        ) ranked
+        WHERE rn = 1
+        """
+    )
+
+    op.create_index(
+        "ix_best_scores_leaderboard",
+        "best_scores",
+        ["project_id", sa.text("value DESC"), sa.text("created_at DESC"), sa.text("id DESC")],
+        postgresql_include=["username"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_best_scores_leaderboard", table_name="best_scores")
+    op.drop_table("best_scores")
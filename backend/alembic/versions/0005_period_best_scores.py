@@ -0,0 +1,84 @@
+"""Daily / weekly best score buckets (period_best_scores)
+
+Creates period_best_scores, one row per (project_id, period, period_start,
+username), with its leaderboard covering index and the expiry index used by
+the retention job. On PostgreSQL the current day and week are backfilled
+from `scores`; older buckets start empty.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "period_best_scores",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id"), nullable=False),
+        sa.Column("period", sa.String(length=10), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("username", sa.String(length=50), nullable=False),
+        sa.Column("value", sa.Integer(), nullable=False),
+        sa.Column("score_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint(
+            "project_id", "period", "period_start", "username", name="uq_period_best_scores_bucket_username"
+        ),
+    )
+
+    if op.get_bind().dialect.name == "postgresql":
+        # Same tie rule as best_scores: the first submission reaching the best
+        # value of the bucket wins. 'day' / 'week' truncation is ISO (Monday).
+        for period, unit in (("daily", "day"), ("weekly", "week")):
+            op.execute(
+                f"""
+                INSERT INTO period_best_scores
+                    (project_id, period, period_start, username, value, score_id, created_at)
+                SELECT project_id, '{period}', bucket, username, value, id, created_at
+                FROM (
+                    SELECT project_id, username, value, id, created_at,
+                           date_trunc('{unit}', created_at AT TIME ZONE 'UTC')::date AS bucket,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY project_id, username
+                               ORDER BY value DESC, created_at ASC, id ASC
+                           ) AS rn
+                    FROM scores
+                    WHERE created_at >= date_trunc('{unit}', now() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+                ) ranked
+                WHERE rn = 1
+                """
+            )
+
+    op.create_index(
+        "ix_period_best_scores_leaderboard",
+        "period_best_scores",
+        [
+            "project_id",
+            "period",
+            "period_start",
+            sa.text("value DESC"),
+            sa.text("created_at DESC"),
+            sa.text("id DESC"),
+        ],
+        postgresql_include=["username"],
+    )
+    op.create_index("ix_period_best_scores_expiry", "period_best_scores", ["period", "period_start"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_period_best_scores_expiry", table_name="period_best_scores")
+    op.drop_index("ix_period_best_scores_leaderboard", table_name="period_best_scores")
+    op.drop_table("period_best_scores")
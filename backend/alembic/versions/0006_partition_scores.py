@@ -0,0 +1,130 @@
+"""Monthly range partitioning of scores, per-project score retention
+
+- projects.score_retention_days (nullable: use SCORES_RETENTION_DAYS)
+- PostgreSQL only: `scores` becomes a table partitioned by RANGE (created_at),
+  one partition per UTC month (scores_pYYYY_MM), from the oldest score up to
+  three months ahead. The primary key becomes (id, created_at), as PostgreSQL
+  requires the partition key in unique constraints; ids keep coming from
+  scores_id_seq.
+
+The rows are copied into the new table, which holds an exclusive lock on
+`scores` for the duration: run it in a maintenance window on large tables.
+Afterwards run `python -m app.maintenance maintain-scores` regularly (daily)
+so that future partitions exist before they are needed.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MONTHS_AHEAD = 3
+
+
+def _add_months(d: date, months: int) -> date:
+    index = d.year * 12 + (d.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _create_indexes() -> None:
+    op.create_index("ix_scores_username", "scores", ["username"])
+    op.create_index(
+        "ix_scores_leaderboard",
+        "scores",
+        ["project_id", sa.text("value DESC"), sa.text("created_at DESC"), sa.text("id DESC")],
+        postgresql_include=["username"],
+    )
+
+
+def _move_to_new_table(create_sql: str) -> None:
+    """Swap `scores` for a new table created by `create_sql`, keeping rows and ids."""
+    op.execute("ALTER TABLE scores RENAME TO scores_old")
+    op.execute("ALTER TABLE scores_old RENAME CONSTRAINT scores_pkey TO scores_old_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_scores_leaderboard")
+    op.execute("DROP INDEX IF EXISTS ix_scores_username")
+    op.execute("ALTER SEQUENCE scores_id_seq OWNED BY NONE")
+    op.execute(create_sql)
+    op.execute("ALTER SEQUENCE scores_id_seq OWNED BY scores.id")
+
+
+def upgrade() -> None:
+    op.add_column("projects", sa.Column("score_retention_days", sa.Integer(), nullable=True))
+
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("LOCK TABLE scores IN ACCESS EXCLUSIVE MODE")
+    oldest = bind.execute(sa.text("SELECT min(created_at) FROM scores")).scalar()
+    today = datetime.now(timezone.utc).date()
+    first = (oldest.astimezone(timezone.utc).date() if oldest else today).replace(day=1)
+
+    _move_to_new_table(
+        """
+        CREATE TABLE scores (
+            id integer NOT NULL DEFAULT nextval('scores_id_seq'),
+            project_id integer NOT NULL REFERENCES projects (id),
+            username varchar(50) NOT NULL,
+            value integer NOT NULL,
+            created_at timestamp with time zone NOT NULL DEFAULT now(),
+            CONSTRAINT scores_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+
+    month, last = first, _add_months(today, MONTHS_AHEAD)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE scores_p{month:%Y_%m} PARTITION OF scores "
+            f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+            f"TO ('{_add_months(month, 1).isoformat()} 00:00:00+00')"
+        )
+        month = _add_months(month, 1)
+
+    op.execute(
+        "INSERT INTO scores (id, project_id, username, value, created_at) "
+        "SELECT id, project_id, username, value, created_at FROM scores_old"
+    )
+    op.execute("DROP TABLE scores_old")
+    # Built after the copy (faster than maintaining them row by row).
+    _create_indexes()
+    op.execute("ANALYZE scores")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        # Archived (detached) partitions are not merged back.
+        op.execute("LOCK TABLE scores IN ACCESS EXCLUSIVE MODE")
+        _move_to_new_table(
+            """
+            CREATE TABLE scores (
+                id integer NOT NULL DEFAULT nextval('scores_id_seq'),
+                project_id integer NOT NULL REFERENCES projects (id),
+                username varchar(50) NOT NULL,
+                value integer NOT NULL,
+                created_at timestamp with time zone NOT NULL DEFAULT now(),
+                CONSTRAINT scores_pkey PRIMARY KEY (id)
+            )
+            """
+        )
+        op.execute(
+            "INSERT INTO scores (id, project_id, username, value, created_at) "
+            "SELECT id, project_id, username, value, created_at FROM scores_old"
+        )
+        op.execute("DROP TABLE scores_old")
+        _create_indexes()
+
+    op.drop_column("projects", "score_retention_days")
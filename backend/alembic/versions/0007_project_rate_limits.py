@@ -0,0 +1,28 @@
+"""Add per-project score submission rate limits
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("projects", sa.Column("rate_limit_per_minute", sa.Integer(), nullable=True))
+    op.add_column("projects", sa.Column("rate_limit_burst", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("projects", "rate_limit_burst")
+    op.drop_column("projects", "rate_limit_per_minute")
@@ -0,0 +1,36 @@
+"""Add score_idempotency_keys for idempotent score submission
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "score_idempotency_keys",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id"), nullable=False),
+        sa.Column("key", sa.String(length=128), nullable=False),
+        sa.Column("score_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint("project_id", "key", name="uq_score_idempotency_keys_project_key"),
+    )
+    op.create_index("ix_score_idempotency_keys_created_at", "score_idempotency_keys", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_score_idempotency_keys_created_at", table_name="score_idempotency_keys")
+    op.drop_table("score_idempotency_keys")
@@ -0,0 +1,26 @@
+"""Add a per-project leaderboard snapshot staleness bound
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("projects", sa.Column("leaderboard_snapshot_max_age_seconds", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("projects", "leaderboard_snapshot_max_age_seconds")
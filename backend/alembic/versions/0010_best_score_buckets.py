@@ -0,0 +1,63 @@
+"""Per-bucket player counts for rank lookups (best_score_buckets)
+
+Creates best_score_buckets, the number of players per project whose best
+score falls in each log-scaled value bucket, and best_scores.previous_value,
+through which the write path learns the bucket a raised player left. The
+counts are backfilled from best_scores.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.crud.projects.score_bucket() (SCORE_BUCKET_BITS = 6).
+BUCKET_BITS = 6
+
+
+def _bucket(value: int) -> int:
+    if value < 0:
+        return -1 - _bucket(-1 - value)
+    shift = max(value.bit_length() - BUCKET_BITS - 1, 0)
+    return (shift << BUCKET_BITS) + (value >> shift)
+
+
+def upgrade() -> None:
+    op.add_column("best_scores", sa.Column("previous_value", sa.Integer(), nullable=True))
+    buckets = op.create_table(
+        "best_score_buckets",
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id"), primary_key=True),
+        sa.Column("bucket", sa.Integer(), primary_key=True, autoincrement=False),
+        sa.Column("players", sa.Integer(), nullable=False),
+    )
+
+    # One row per distinct (project, value), folded into buckets here: the
+    # bucket function has no portable SQL form.
+    counts: dict[tuple[int, int], int] = {}
+    rows = op.get_bind().execute(
+        sa.text("SELECT project_id, value, COUNT(*) FROM best_scores GROUP BY project_id, value")
+    )
+    for project_id, value, players in rows:
+        key = (project_id, _bucket(value))
+        counts[key] = counts.get(key, 0) + players
+    if counts:
+        op.bulk_insert(
+            buckets,
+            [{"project_id": p, "bucket": b, "players": n} for (p, b), n in sorted(counts.items())],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("best_score_buckets")
+    op.drop_column("best_scores", "previous_value")
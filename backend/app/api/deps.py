@@ -1,12 +1,17 @@
-from fastapi import Depends, HTTPException, Security, status
+import math
+
+from fastapi import Depends, HTTPException, Response, Security, status
 from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.security import decode_token
-from app.crud.projects import get_project_by_api_key
-from app.crud.users import get_user_by_username
-from app.db.session import get_db
-from app.models import Project, User
+from app.core.security import decode_token_claims
+from app.crud.projects import ProjectRef, get_project_by_api_key_async
+from app.crud.users import AuthUser, get_auth_user, get_user_by_username
+from app.core.config import settings
+from app.db.replicas import replica_router
+from app.db.session import get_async_db, get_db
+from app.services.rate_limit import rate_limiter
 
 # OAuth2 bearer token extractor.
 # FastAPI uses this to read: Authorization: Bearer <token>
@@ -20,22 +25,24 @@ api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 def get_current_user(
     db: Session = Depends(get_db),
     token: str = Depends(oauth2_scheme),
-) -> User:
+) -> AuthUser:
     """
     Resolve the currently authenticated dashboard user (JWT-based).
 
     Auth mechanism:
     - Reads Authorization: Bearer <JWT>
     - Decodes/validates token signature and expiration
-    - Extracts the `sub` claim (username)
-    - Loads the user from database
+    - Resolves the user from the `uid` claim through a short-TTL cache
+      (no DB query on a cache hit)
+    - Rejects the token if its `tv` claim is older than the user's token_version
+    - Tokens issued before `uid` existed fall back to a lookup by `sub` (username)
 
     Raises:
-    - 401 Invalid token: token is missing/invalid/expired
+    - 401 Invalid token: token is missing/invalid/expired/revoked
     - 401 User not found: token is valid but the user no longer exists
     """
     try:
-        username = decode_token(token)
+        claims = decode_token_claims(token)
     except Exception:
         # Deliberately not leaking decoding details to the client
         raise HTTPException(
@@ -43,27 +50,61 @@ def get_current_user(
             detail="Invalid token",
         )
 
-    user = get_user_by_username(db, username)
-    if not user:
+    if "uid" in claims:
+        user = get_auth_user(db, int(claims["uid"]))
+    else:
+        row = get_user_by_username(db, str(claims["sub"]))
+        user = AuthUser(row.id, row.username, row.token_version) if row else None
+
+    if not user or user.username != claims["sub"]:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
 
+    if claims.get("tv", 0) != user.token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token",
+        )
+
     return user
 
 
-def require_project_from_api_key(
-    db: Session = Depends(get_db),
+def get_projects_read_db(user: AuthUser = Depends(get_current_user)):
+    """
+    FastAPI dependency that provides a read-only Session for the current
+    user's projects: a replica, unless the user changed a project recently
+    (read-your-writes) or no replica is healthy (see app.db.replicas).
+    """
+    db = replica_router.session(("user", user.id))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_leaderboard_read_db(project_id: int):
+    """
+    FastAPI dependency that provides a read-only AsyncSession for a project's
+    leaderboard: a replica, unless this worker wrote scores to the project
+    recently (read-your-writes) or no replica is healthy (see app.db.replicas).
+    """
+    async with replica_router.async_session(("project", project_id)) as db:
+        yield db
+
+
+async def require_project_from_api_key(
+    db: AsyncSession = Depends(get_async_db),
     api_key: str | None = Security(api_key_header),
-) -> Project:
+) -> ProjectRef:
     """
     Resolve the project associated with a game client's API key (API-key based).
 
     Auth mechanism:
     - Reads X-API-Key: <api_key>
-    - Looks up the project via a hashed key comparison in the database
-    - Returns the Project as the multi-tenant boundary
+    - Looks up the project via a hashed key comparison (cached per process)
+    - Returns the project (id, name, rate limits) as the multi-tenant boundary
 
     Raises:
     - 401 Missing API key: header not provided
@@ -75,11 +116,39 @@ def require_project_from_api_key(
             detail="Missing API key",
         )
 
-    project = get_project_by_api_key(db, api_key)
+    project = await get_project_by_api_key_async(db, api_key)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Invalid API key",
         )
 
-    return project
\ No newline at end of file
+    return project
+
+
+async def enforce_rate_limit(project: ProjectRef, response: Response, cost: int = 1) -> None:
+    """
+    Charge `cost` tokens to the project's score submission bucket.
+
+    - No DB access: the limits travel with the cached ProjectRef
+    - Sets RateLimit-Limit / RateLimit-Remaining / RateLimit-Reset on `response`
+
+    Raises:
+    - 429 Rate limit exceeded: bucket empty (same headers, plus Retry-After)
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+
+    decision = await rate_limiter.hit(f"project:{project.id}", project.rate_limit, cost)
+    headers = {
+        "RateLimit-Limit": str(decision.limit),
+        "RateLimit-Remaining": str(decision.remaining),
+        "RateLimit-Reset": str(math.ceil(decision.reset)),
+    }
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={**headers, "Retry-After": str(max(1, math.ceil(decision.retry_after)))},
+        )
+    response.headers.update(headers)
@@ -0,0 +1,115 @@
+import logging
+import re
+import time
+
+from app.db.instrumentation import QueryStats, track_queries
+from app.services.metrics import Histogram, registry
+
+logger = logging.getLogger("app.slow_requests")
+
+# SQL statements per request: 0 for cache hits, a handful for a normal
+# request; a long tail usually means one query per row (N+1).
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+REQUEST_DURATION = registry.register(
+    Histogram(
+        "scoreforge_http_request_duration_seconds",
+        "Time to serve a request, until its last body byte (streams: until they end).",
+        labelnames=("method", "route", "status"),
+    )
+)
+REQUEST_DB_QUERIES = registry.register(
+    Histogram(
+        "scoreforge_http_request_db_queries",
+        "SQL statements executed per request.",
+        labelnames=("method", "route"),
+        buckets=QUERY_COUNT_BUCKETS,
+    )
+)
+REQUEST_DB_DURATION = registry.register(
+    Histogram(
+        "scoreforge_http_request_db_seconds",
+        "Time spent in SQL statements per request.",
+        labelnames=("method", "route"),
+    )
+)
+
+
+class RequestMetricsMiddleware:
+    """
+    Records per-route latency and SQL usage of every HTTP request.
+
+    - Routes are labelled by their template (/scores/leaderboard/{project_id}),
+      requests matching no route as "unmatched", to keep label sets bounded.
+    - SQL statements are attributed through `track_queries()` (engine events),
+      including those run in the threadpool or in streaming bodies.
+    - With `slow_request_seconds`, statement texts are captured for every
+      request and logged for those slower than the threshold (no parameters,
+      so no user data in the log).
+
+    Pure ASGI (not BaseHTTPMiddleware): the application runs in the same
+    task and context, and streaming responses are not buffered.
+    """
+
+    def __init__(self, app, slow_request_seconds: float | None = None, max_statements: int = 200) -> None:
+        self.app = app
+        self.slow_request_seconds = slow_request_seconds
+        self.max_statements = max_statements
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500  # if the app fails before starting a response
+
+        async def send_and_capture_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        capture = self.slow_request_seconds is not None
+        start = time.perf_counter()
+        with track_queries(capture, self.max_statements) as queries:
+            try:
+                await self.app(scope, receive, send_and_capture_status)
+            finally:
+                self._record(scope, status, time.perf_counter() - start, queries)
+
+    def _record(self, scope, status: int, seconds: float, queries: QueryStats) -> None:
+        route = getattr(scope.get("route"), "path", None) or "unmatched"
+        method = scope["method"]
+        REQUEST_DURATION.observe(seconds, method=method, route=route, status=str(status))
+        REQUEST_DB_QUERIES.observe(queries.count, method=method, route=route)
+        REQUEST_DB_DURATION.observe(queries.seconds, method=method, route=route)
+        if self.slow_request_seconds is not None and seconds >= self.slow_request_seconds:
+            logger.warning(
+                "Slow request: %s %s -> %s in %.1f ms, %d SQL statements (%.1f ms)%s",
+                method,
+                route,
+                status,
+                seconds * 1000,
+                queries.count,
+                queries.seconds * 1000,
+                _statement_summary(queries),
+            )
+
+
+def _statement_summary(queries: QueryStats) -> str:
+    """
+    One line per distinct statement, most expensive first: "  12x   8.3 ms  SELECT ...".
+
+    Repeated identical statements (N+1 patterns) collapse into one line with
+    their count.
+    """
+    grouped: dict[str, list[float]] = {}
+    for statement, seconds in queries.statements:
+        grouped.setdefault(re.sub(r"\s+", " ", statement).strip(), []).append(seconds)
+    lines = [
+        f"\n  {len(times):>4}x {sum(times) * 1000:>8.1f} ms  {statement[:300]}"
+        for statement, times in sorted(grouped.items(), key=lambda item: -sum(item[1]))
+    ]
+    if queries.count > len(queries.statements):
+        lines.append(f"\n  ({queries.count - len(queries.statements)} more statements not captured)")
+    return "".join(lines)
@@ -1,16 +1,20 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
+from app.api.deps import get_current_user
 from app.db.session import get_db
 from app.schemas.auth import UserCreate, UserOut, TokenOut
 from app.crud.users import (
     get_user_by_username,
     get_user_by_email,
     create_user,
-    authenticate_user,
+    revoke_user_tokens,
+    set_password_hash,
 )
 from app.core.security import create_access_token
+from app.services.password_hasher import PasswordHasherBusy, password_hasher
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -27,22 +31,29 @@ router = APIRouter(prefix="/auth", tags=["auth"])
         "- Email must be unique\n\n"
         "Security:\n"
         "- Password is hashed server-side (bcrypt)\n"
-        "- Plain passwords are never stored"
+        "- Plain passwords are never stored\n\n"
+        "Responses:\n"
+        "- 503 + Retry-After: too many password hashes in progress, retry later"
     ),
 )
-def register(user_in: UserCreate, db: Session = Depends(get_db)) -> UserOut:
+async def register(user_in: UserCreate, db: Session = Depends(get_db)) -> UserOut:
     """
     Register a new dashboard user account.
 
     - Checks that username/email are unique.
-    - Delegates password hashing + persistence to the CRUD layer.
+    - Hashes the password in the password hashing pool (not on a request thread).
+    - Delegates persistence to the CRUD layer.
     - Returns a public user representation (no password fields).
+
+    The route is async so that waiting for the hash holds no thread; the sync
+    DB calls run in the threadpool.
     """
-    if get_user_by_username(db, user_in.username):
+    if await run_in_threadpool(get_user_by_username, db, user_in.username):
         raise HTTPException(status_code=400, detail="Username already exists")
-    if get_user_by_email(db, user_in.email):
+    if await run_in_threadpool(get_user_by_email, db, user_in.email):
         raise HTTPException(status_code=400, detail="Email already exists")
-    return create_user(db, user_in)
+    hashed = await _password_hash_call(password_hasher.hash, user_in.password)
+    return await run_in_threadpool(create_user, db, user_in, hashed)
 
 
 @router.post(
@@ -58,10 +69,12 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)) -> UserOut:
         "- access_token (JWT)\n"
         "- token_type=bearer\n\n"
         "Use the token in subsequent requests:\n"
-        "Authorization: Bearer <token>"
+        "Authorization: Bearer <token>\n\n"
+        "Responses:\n"
+        "- 503 + Retry-After: too many password checks in progress, retry later"
     ),
 )
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ) -> TokenOut:
@@ -70,11 +83,55 @@ def login(
 
     Notes:
     - Uses OAuth2PasswordRequestForm (form-data) to match FastAPI's OAuth2 tooling.
+    - The password check runs in the password hashing pool; a hash made with an
+      outdated BCRYPT_ROUNDS is replaced on success.
     - The JWT `sub` claim uses the username for stable identity lookup.
+    - `uid` and `tv` claims let authenticated requests skip the user query.
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await run_in_threadpool(get_user_by_username, db, form_data.username)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    valid, new_hash = await _password_hash_call(
+        password_hasher.verify_and_update, form_data.password, user.hashed_password
+    )
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+
+    token = create_access_token(subject=user.username, user_id=user.id, token_version=user.token_version)
+    if new_hash:
+        await run_in_threadpool(set_password_hash, db, user, new_hash)
+    return {"access_token": token, "token_type": "bearer"}
+
+
+@router.post(
+    "/revoke",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke all of the current user's tokens",
+    description=(
+        "Invalidates every JWT issued to the authenticated user so far "
+        "(including the one used for this request).\n\n"
+        "Notes:\n"
+        "- Takes effect immediately on the worker handling the request and within\n"
+        "  USER_CACHE_TTL_SECONDS on the others."
+    ),
+)
+def revoke(
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+) -> None:
+    """
+    Log the user out everywhere by bumping their token version.
+    """
+    revoke_user_tokens(db, user.id)
+
 
-    token = create_access_token(subject=user.username)
-    return {"access_token": token, "token_type": "bearer"}
\ No newline at end of file
+async def _password_hash_call(fn, *args):
+    """Run a password hasher call, mapping load shedding to 503 + Retry-After."""
+    try:
+        return await fn(*args)
+    except PasswordHasherBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many authentication requests, retry later",
+            headers={"Retry-After": "1"},
+        )
@@ -1,11 +1,19 @@
+import csv
+import io
+import json
+from typing import Iterator
+
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
-from app.api.deps import get_current_user
-from app.schemas.projects import ProjectCreate, ProjectOut, ApiKeyCreated
-from app.crud.projects import create_project, list_projects, create_api_key
+from app.db.session import SessionLocal, get_db
+from app.api.deps import get_current_user, get_projects_read_db
+from app.schemas.projects import ExportFormat, ProjectCreate, ProjectOut, ProjectUpdate, ApiKeyCreated
+from app.schemas.scores import LeaderboardMode
+from app.crud.projects import create_project, list_projects, create_api_key, iter_leaderboard, update_project
 from app.models import Project as ProjectModel
+from app.services.leaderboard_index import RankedEntry
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
@@ -42,12 +50,14 @@ def create(
     summary="List user projects",
     description=(
         "Lists projects belonging to the authenticated user.\n\n"
+        "Served from a read replica when the server has some; changes made by the\n"
+        "same user are visible immediately.\n\n"
         "Security:\n"
         "- Requires JWT"
     ),
 )
 def list_(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_projects_read_db),
     user=Depends(get_current_user),
 ) -> list[ProjectOut]:
     """
@@ -56,6 +66,38 @@ def list_(
     return list_projects(db, owner_id=user.id)
 
 
+@router.patch(
+    "/{project_id}",
+    response_model=ProjectOut,
+    summary="Update project settings",
+    description=(
+        "Updates settings of a project owned by the authenticated user.\n\n"
+        "Fields:\n"
+        "- score_retention_days: days of score history kept (null = server default);\n"
+        "  older scores are removed by the maintenance job\n"
+        "- rate_limit_per_minute / rate_limit_burst: token bucket applied to score\n"
+        "  submissions (null = server default)\n"
+        "- leaderboard_snapshot_max_age_seconds: how stale leaderboard reads may be\n"
+        "  when served from snapshots (0 = always live, null = server default)\n\n"
+        "Security:\n"
+        "- Requires JWT"
+    ),
+)
+def update(
+    project_id: int,
+    project_in: ProjectUpdate,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+) -> ProjectOut:
+    """
+    Update a project's settings (project owner only).
+    """
+    project = db.get(ProjectModel, project_id)
+    if not project or project.owner_id != user.id:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return update_project(db, project, project_in)
+
+
 @router.post(
     "/{project_id}/keys",
     response_model=ApiKeyCreated,
@@ -92,4 +134,91 @@ def new_key(
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
 
-    return {"api_key": raw_key, "project_id": project_id}
\ No newline at end of file
+    return {"api_key": raw_key, "project_id": project_id}
+
+
+@router.get(
+    "/{project_id}/export",
+    summary="Export a full leaderboard (NDJSON or CSV)",
+    description=(
+        "Streams every row of a project leaderboard, in ranking order.\n\n"
+        "Formats:\n"
+        "- ndjson (default): one JSON object per line\n"
+        "- csv: header line, then one row per score\n\n"
+        "Fields: rank, username, value, created_at (ISO 8601)\n\n"
+        "Security:\n"
+        "- Requires JWT\n"
+        "- Project owner only"
+    ),
+    response_class=StreamingResponse,
+)
+def export(
+    project_id: int,
+    format: ExportFormat = "ndjson",
+    mode: LeaderboardMode = "all",
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Stream a project's leaderboard to the owner (project owner only).
+
+    - Rows go through a server-side cursor in fixed-size chunks, so memory use
+      does not depend on the project size.
+    - The body is produced after this handler returns (and after `db` is
+      closed), so the stream opens its own session.
+    """
+    project = db.get(ProjectModel, project_id)
+    if not project or project.owner_id != user.id:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_chunks(project_id, mode, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="project-{project_id}-{mode}.{format}"'},
+    )
+
+
+def _export_chunks(project_id: int, mode: LeaderboardMode, format: ExportFormat) -> Iterator[bytes]:
+    """
+    Serialize the leaderboard chunk by chunk (one bytes object per cursor fetch).
+
+    Sync generator: Starlette iterates it in the threadpool. Closing it (client
+    disconnect) closes the cursor and returns the connection to the pool.
+    """
+    db = SessionLocal()
+    try:
+        rank = 0
+        if format == "csv":
+            yield b"rank,username,value,created_at\r\n"
+        for entries in iter_leaderboard(db, project_id, mode):
+            chunk = _csv_lines(rank, entries) if format == "csv" else _ndjson_lines(rank, entries)
+            rank += len(entries)
+            yield chunk.encode("utf-8")
+    finally:
+        db.close()
+
+
+def _ndjson_lines(rank: int, entries: list[RankedEntry]) -> str:
+    return "".join(
+        json.dumps(
+            {"rank": rank + i, "username": e.username, "value": e.value, "created_at": e.created_at.isoformat()},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        + "\n"
+        for i, e in enumerate(entries, start=1)
+    )
+
+
+def _csv_lines(rank: int, entries: list[RankedEntry]) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    for i, e in enumerate(entries, start=1):
+        writer.writerow([rank + i, _csv_safe(e.username), e.value, e.created_at.isoformat()])
+    return out.getvalue()
+
+
+def _csv_safe(text: str) -> str:
+    """Neutralize spreadsheet formulas in user-provided cells (CSV injection)."""
+    return "'" + text if text[:1] in ("=", "+", "-", "@") else text
@@ -1,10 +1,38 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+import asyncio
+import json
 
-from app.db.session import get_db
-from app.api.deps import require_project_from_api_key
-from app.schemas.scores import ScoreSubmit, ScoreOut
-from app.crud.projects import submit_score, leaderboard
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import get_async_db
+from app.api.deps import enforce_rate_limit, get_leaderboard_read_db, require_project_from_api_key
+from app.schemas.scores import (
+    MAX_IDEMPOTENCY_KEY_LENGTH,
+    MAX_LEADERBOARD_PAGE_SIZE,
+    LeaderboardMode,
+    PlayerRankOut,
+    ScoreBatchOut,
+    ScoreBatchSubmit,
+    ScoreSubmit,
+    ScoreOut,
+)
+from app.crud.projects import (
+    expire_index_board,
+    leaderboard_async,
+    player_rank_async,
+    replayed_score_async,
+    submit_score_async,
+    submit_scores_async,
+)
+from app.services.cursors import InvalidCursor, decode_cursor, encode_cursor
+from app.services.ingest import IngestQueueFull, score_ingest
+from app.services.leaderboard_snapshots import leaderboard_snapshots
+from app.services.leaderboard_stream import StreamKey, TooManySubscribers, leaderboard_broadcaster
+from app.services.leaderboard_versions import etag_matches, leaderboard_versions
+from app.services.periods import board_name
+from app.services.response_cache import leaderboard_responses
 
 router = APIRouter(prefix="/scores", tags=["scores"])
 
@@ -14,6 +42,20 @@ router = APIRouter(prefix="/scores", tags=["scores"])
     summary="Submit a score (API key)",
     description=(
         "Submits a score to a project leaderboard.\n\n"
+        "Responses:\n"
+        "- 200 {ok, id}: stored (default `sync` ingestion mode)\n"
+        "- 202 {ok, queued}: accepted for asynchronous storage (`queued` mode)\n"
+        "- 429 + Retry-After: the project's submission rate limit is exceeded\n"
+        "- 503 + Retry-After: the ingestion queue is full, retry later\n\n"
+        "Idempotency:\n"
+        "- Send a unique `Idempotency-Key` header (or `idempotency_key` field) per\n"
+        "  score and reuse it when retrying: a retry of a stored score returns the\n"
+        "  original `id` and stores nothing (keys are kept for 24 hours by default)\n"
+        "- In `queued` mode, a retry of a score that is still queued is accepted\n"
+        "  again (202) and deduplicated when written\n\n"
+        "Rate limiting:\n"
+        "- Every response carries RateLimit-Limit (burst size), RateLimit-Remaining\n"
+        "  and RateLimit-Reset (seconds until the bucket is full again)\n\n"
         "Security:\n"
         "- Requires X-API-Key header\n"
         "- The API key identifies the project (multi-tenant boundary)\n\n"
@@ -21,9 +63,11 @@ router = APIRouter(prefix="/scores", tags=["scores"])
         "X-API-Key: <project_api_key>"
     ),
 )
-def submit(
+async def submit(
     score_in: ScoreSubmit,
-    db: Session = Depends(get_db),
+    response: Response,
+    idempotency_key: str | None = Header(None, min_length=1, max_length=MAX_IDEMPOTENCY_KEY_LENGTH),
+    db: AsyncSession = Depends(get_async_db),
     project=Depends(require_project_from_api_key),
 ) -> dict:
     """
@@ -31,9 +75,72 @@ def submit(
 
     - `require_project_from_api_key` resolves the project by API key.
     - Scores are stored under the resolved project ID.
+    - In queued ingestion mode the score is handed to the write-behind queue.
+    - With an idempotency key, retries get the first submission's id back.
+    """
+    await enforce_rate_limit(project, response)
+    if idempotency_key is not None:
+        if score_in.idempotency_key not in (None, idempotency_key):
+            raise HTTPException(status_code=400, detail="Idempotency-Key header and idempotency_key field differ")
+        score_in = score_in.model_copy(update={"idempotency_key": idempotency_key})
+
+    if score_ingest.running:
+        if score_in.idempotency_key is not None:
+            replayed = await replayed_score_async(db, project.id, score_in.idempotency_key)
+            if replayed is not None:
+                return {"ok": True, "id": replayed.id}
+        try:
+            score_ingest.submit(project.id, score_in)
+        except IngestQueueFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Score queue is full, retry later",
+                headers={"Retry-After": "1"},
+            )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"ok": True, "queued": True}
+
+    entry = await submit_score_async(db, project_id=project.id, score_in=score_in)
+    return {"ok": True, "id": entry.id}
+
+
+@router.post(
+    "/submit/batch",
+    response_model=ScoreBatchOut,
+    summary="Submit a batch of scores (API key)",
+    description=(
+        "Submits up to 500 scores to a project leaderboard in one request.\n\n"
+        "Behavior:\n"
+        "- Every item is validated like `/scores/submit`; any invalid item rejects the\n"
+        "  whole batch with 422 (the error `loc` points at the item index)\n"
+        "- Valid batches are stored atomically in a single transaction\n"
+        "- `results[i]` gives the stored score ID of item `i`\n"
+        "- Items may carry an `idempotency_key`: an item whose key was already used\n"
+        "  is not stored again, its result is the original score ID\n"
+        "- Counts as one submission per score against the rate limit (429 +\n"
+        "  Retry-After when exceeded, see `/scores/submit`)\n\n"
+        "Headers:\n"
+        "X-API-Key: <project_api_key>"
+    ),
+)
+async def submit_batch(
+    batch_in: ScoreBatchSubmit,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    project=Depends(require_project_from_api_key),
+) -> ScoreBatchOut:
     """
-    row = submit_score(db, project_id=project.id, score_in=score_in)
-    return {"ok": True, "id": row.id}
+    Submit many scores for the authenticated project (API key based).
+
+    Intended for game servers that aggregate match results.
+    """
+    await enforce_rate_limit(project, response, cost=len(batch_in.scores))
+    rows = await submit_scores_async(db, project_id=project.id, scores_in=batch_in.scores)
+    return {
+        "ok": True,
+        "accepted": len(rows),
+        "results": [{"index": i, "id": r.id} for i, r in enumerate(rows)],
+    }
 
 
 @router.get(
@@ -42,20 +149,188 @@ def submit(
     summary="Get leaderboard (public read)",
     description=(
         "Returns the top scores for a given project.\n\n"
+        "Modes:\n"
+        "- all (default): every submitted score, a player may appear several times\n"
+        "- best: one row per player (their best score)\n"
+        "- daily / weekly: one row per player, best score of the current UTC day /\n"
+        "  ISO week (Monday 00:00 UTC); boards start empty at each rollover\n\n"
+        "Pagination:\n"
+        f"- `limit` is the page size (1-{MAX_LEADERBOARD_PAGE_SIZE})\n"
+        "- A full page carries an `X-Next-Cursor` header; pass it back as `cursor`\n"
+        "  (same `mode`) to get the following page\n"
+        "- 400 if the cursor is malformed or was issued for another board (e.g. a\n"
+        "  daily cursor after midnight UTC): restart from the first page\n\n"
+        "Caching:\n"
+        "- Responses carry `Cache-Control: public, max-age=N`\n"
+        "- When ETags are enabled, send the last `ETag` in `If-None-Match`;\n"
+        "  `304 Not Modified` means the leaderboard has not changed\n"
+        "- When the server enables leaderboard snapshots, results may lag writes by\n"
+        "  up to the project's snapshot staleness bound\n"
+        "- When the server reads from replicas, scores submitted through another\n"
+        "  server worker may take a few seconds to appear\n\n"
         "Notes:\n"
         "- This endpoint is currently public read (no auth)."
     ),
 )
-def get_leaderboard(
+async def get_leaderboard(
     project_id: int,
-    limit: int = 20,
-    db: Session = Depends(get_db),
+    request: Request,
+    limit: int = Query(20, ge=1, le=MAX_LEADERBOARD_PAGE_SIZE),
+    mode: LeaderboardMode = "all",
+    cursor: str | None = Query(None, description="`X-Next-Cursor` value of the previous page."),
+    db: AsyncSession = Depends(get_leaderboard_read_db),
 ) -> list[ScoreOut]:
     """
-    Fetch the top scores for a project.
+    Fetch the top scores for a project, one page at a time.
 
     - Ordered by score descending (implementation in CRUD layer).
     - Returns a list of username + value pairs.
+    - Pages are chained with keyset cursors (never OFFSET).
+    - Conditional requests are answered from the in-memory version counter,
+      without a DB query.
+    - Bodies are cached as JSON bytes and returned as-is (no query, no
+      response_model validation) until the project's next write.
+    """
+    # Windowed modes change at each rollover without any write: key caches
+    # and ETags by board (mode + current bucket), not by mode.
+    board = board_name(mode)
+    after = None
+    if cursor is not None:
+        try:
+            cursor_board, after = decode_cursor(cursor)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if cursor_board != board:
+            raise HTTPException(status_code=400, detail="Cursor does not match this leaderboard")
+
+    expire_index_board(project_id, board)
+    # The body may come from a snapshot, which is refreshed without any write:
+    # key ETags and cached bodies by the snapshot too, not only by the version.
+    query = (board, limit, cursor, leaderboard_snapshots.generation((project_id, board)))
+    headers = {"Cache-Control": _leaderboard_cache_control()}
+    if settings.LEADERBOARD_ETAGS_ENABLED:
+        headers["ETag"] = leaderboard_versions.etag(project_id, *query)
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    # Read the version before the data (see ResponseCache).
+    version = leaderboard_versions.get(project_id)
+    cached = leaderboard_responses.get(project_id, query, version)
+    if cached is None:
+        rows = await leaderboard_async(db, project_id=project_id, limit=limit, mode=mode, after=after)
+        body = _json_bytes([{"username": r.username, "value": r.value} for r in rows])
+        page_headers = {"X-Next-Cursor": encode_cursor(board, rows[-1])} if len(rows) == limit else {}
+        leaderboard_responses.set(project_id, query, version, body, page_headers)
+    else:
+        body, page_headers = cached
+
+    return Response(content=body, media_type="application/json", headers={**headers, **page_headers})
+
+
+def _json_bytes(content) -> bytes:
+    """Serialize like FastAPI's JSONResponse (compact, UTF-8)."""
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _leaderboard_cache_control() -> str:
+    max_age = settings.LEADERBOARD_CACHE_MAX_AGE_SECONDS
+    return f"public, max-age={max_age}" if max_age > 0 else "no-cache"
+
+
+@router.get(
+    "/stream/{project_id}",
+    summary="Stream leaderboard changes (public read, Server-Sent Events)",
+    description=(
+        "Pushes the top `limit` rows of a leaderboard as they change, instead of polling.\n\n"
+        "Events (`text/event-stream`, JSON `data`):\n"
+        "- `snapshot`: full list `[{rank, username, value}, ...]`, sent first (and again\n"
+        "  if the client falls behind)\n"
+        "- `diff`: `{size, changed: [{rank, username, value}, ...]}`: replace the rows at\n"
+        "  those ranks, then truncate the list to `size`\n"
+        "- `close`: the server is shutting down; reconnect\n\n"
+        "Notes:\n"
+        "- Bursts of submissions are coalesced into at most one event per tick\n"
+        "- A comment line is sent periodically to keep idle connections open\n"
+        "- 503 + Retry-After when the server has too many open streams"
+    ),
+    response_class=StreamingResponse,
+)
+async def stream_leaderboard(
+    project_id: int,
+    limit: int = Query(10, ge=1, le=MAX_LEADERBOARD_PAGE_SIZE),
+    mode: LeaderboardMode = "all",
+) -> StreamingResponse:
+    """
+    Subscribe to a leaderboard view.
+
+    All subscribers of the same (project, mode, limit) share one query per
+    tick (see LeaderboardBroadcaster); this handler only relays its queue.
+    """
+    key = StreamKey(project_id, mode, limit)
+    try:
+        queue = await leaderboard_broadcaster.subscribe(key)
+    except TooManySubscribers:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many open streams, retry later",
+            headers={"Retry-After": "5"},
+        )
+    return StreamingResponse(
+        _sse_events(key, queue),
+        media_type="text/event-stream",
+        # no-transform / X-Accel-Buffering: keep proxies from buffering events.
+        headers={"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _sse_events(key: StreamKey, queue: asyncio.Queue):
+    """Relay broadcaster events as SSE frames until the client goes away."""
+    try:
+        while True:
+            try:
+                event, data = await asyncio.wait_for(
+                    queue.get(), timeout=settings.LEADERBOARD_STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            yield b"event: " + event.encode("ascii") + b"\ndata: " + _json_bytes(data) + b"\n\n"
+            if event == "close":
+                return
+    finally:
+        leaderboard_broadcaster.unsubscribe(key, queue)
+
+
+@router.get(
+    "/rank/{project_id}/{username}",
+    response_model=PlayerRankOut,
+    summary="Get a player's rank (public read)",
+    description=(
+        "Returns a player's position on the best-per-player leaderboard "
+        "(same ordering as `mode=best`), their best score, and the players "
+        "ranked just above and below them.\n\n"
+        "Notes:\n"
+        "- `neighbors` is the number of players returned on each side (0-50).\n"
+        "- 404 if the player has no score in this project."
+    ),
+)
+async def get_player_rank(
+    project_id: int,
+    username: str,
+    neighbors: int = Query(5, ge=0, le=50),
+    db: AsyncSession = Depends(get_async_db),
+) -> PlayerRankOut:
+    """
+    Look up a player's rank without fetching the leaderboard pages above them.
     """
-    rows = leaderboard(db, project_id=project_id, limit=limit)
-    return [{"username": r.username, "value": r.value} for r in rows]
\ No newline at end of file
+    found = await player_rank_async(db, project_id=project_id, username=username, radius=neighbors)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    rank, best, window = found
+    return {
+        "username": best.username,
+        "rank": rank,
+        "value": best.value,
+        "neighbors": [{"rank": r, "username": e.username, "value": e.value} for r, e in window],
+    }
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,15 +16,202 @@ class Settings(BaseSettings):
     # Database connection string (e.g. Neon Postgres URL)
     DATABASE_URL: str
 
+    # DEV only: create missing tables at startup (Base.metadata.create_all)
+    # instead of running `alembic upgrade head`. For throwaway databases: the
+    # result is not stamped, so later migrations cannot be applied to it.
+    DB_CREATE_TABLES_ON_STARTUP: bool = False
+
+    # Optional URL for the asyncio engine used by the score routes.
+    # Defaults to DATABASE_URL with an asyncio driver (psycopg 3 handles both;
+    # SQLite needs aiosqlite, e.g. sqlite+aiosqlite:///./dev.db).
+    ASYNC_DATABASE_URL: str | None = None
+
+    # Connection pool (applies to the sync and the async engine, per worker).
+    # Total connections per worker can reach DB_POOL_SIZE + DB_MAX_OVERFLOW
+    # for each engine: size it against the DB/PgBouncer limit divided by workers.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    # Seconds to wait for a free connection before failing the request.
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    # Replace connections older than this (seconds, -1 = never). Keep it below
+    # the server/proxy idle timeout so stale connections are rarely handed out.
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Pessimistic disconnect handling: run a ping on every checkout (one extra
+    # round trip per request). With it off, rely on DB_POOL_RECYCLE_SECONDS and
+    # on SQLAlchemy invalidating the pool when a dead connection is detected.
+    DB_POOL_PRE_PING: bool = True
+    # Skip app-side pooling entirely (e.g. when PgBouncer is the only pool).
+    DB_USE_NULL_POOL: bool = False
+
+    # psycopg server-side prepared statements: a query is prepared after being
+    # run this many times on a connection (None = never prepare).
+    DB_PREPARE_THRESHOLD: int | None = 5
+    # Set when connecting through PgBouncer (or another pooler) in transaction
+    # mode: prepared statements are disabled, since consecutive transactions may
+    # run on different server connections.
+    DB_PGBOUNCER_TRANSACTION_MODE: bool = False
+
+    # Comma-separated read replica URLs (e.g. PostgreSQL streaming standbys).
+    # GET /scores/leaderboard and GET /projects then read from a healthy replica
+    # (round-robin) instead of the primary; every write stays on DATABASE_URL.
+    # Each replica gets its own pools, sized like the primary's (DB_POOL_*).
+    DATABASE_REPLICA_URLS: str = ""
+    # Replicas are checked this often; one that fails, or replays WAL more than
+    # DATABASE_REPLICA_MAX_LAG_SECONDS behind, is skipped until it recovers.
+    # When no replica is usable, reads go to the primary.
+    DATABASE_REPLICA_HEALTH_CHECK_SECONDS: float = 5
+    DATABASE_REPLICA_MAX_LAG_SECONDS: float = 5
+    # Read-your-writes: after a worker writes a project's scores (or a user's
+    # projects), its reads of them use the primary for this long. Keep it above
+    # MAX_LAG + HEALTH_CHECK so a client never reads older data than it wrote;
+    # other workers' writes may show up to that late.
+    DATABASE_REPLICA_READ_YOUR_WRITES_SECONDS: float = 15
+
     # JWT signing secret (keep it private, never commit)
     JWT_SECRET: str
 
     # Access token expiration in minutes
     ACCESS_TOKEN_MINUTES: int = 60
 
+    # bcrypt cost factor (log2 of the iterations; +1 doubles the CPU time per
+    # hash). Existing hashes are upgraded on the next successful login.
+    BCRYPT_ROUNDS: int = 12
+
+    # Password hashing runs in a pool of PASSWORD_HASH_WORKERS processes so it
+    # does not compete with request threads (0 = use the threadpool instead,
+    # e.g. on serverless platforms). Beyond PASSWORD_HASH_MAX_PENDING hashes in
+    # flight or queued, /auth/register and /auth/login answer 503 + Retry-After.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+
+    # Request instrumentation, exposed on GET /metrics (Prometheus text format,
+    # per worker): per-route latency, SQL statements and SQL time per request,
+    # SQL statement latency and connection pool usage.
+    METRICS_ENABLED: bool = True
+    # Opt-in slow request log: requests slower than this (seconds) are logged
+    # with the SQL statements they ran, grouped so that repeated statements
+    # (N+1 patterns) stand out. Statement texts only (no parameters); at most
+    # SLOW_REQUEST_LOG_MAX_STATEMENTS are captured per request.
+    SLOW_REQUEST_LOG_SECONDS: float | None = None
+    SLOW_REQUEST_LOG_MAX_STATEMENTS: int = 200
+
     # Comma-separated allowed origins for CORS
     # Example: "http://localhost:3000,https://scoreforge.vercel.app"
     CORS_ORIGINS: str = "http://localhost:3000"
 
+    # In-memory ranked leaderboard index (per project, per process).
+    # Keep it disabled when running several workers unless you accept that each
+    # worker only sees the writes it handled itself.
+    LEADERBOARD_INDEX_ENABLED: bool = False
+
+    # Max number of top entries kept in memory per project.
+    # Reads with a larger `limit` go straight to the database.
+    LEADERBOARD_INDEX_CAPACITY: int = 1000
+
+    # Warm boards are re-read from the database after this many seconds (None =
+    # never): rows deleted by score retention (`maintain-scores` runs in its own
+    # process) and writes handled by other workers show up at the latest then.
+    LEADERBOARD_INDEX_MAX_AGE_SECONDS: float | None = 60
+
+    # HTTP caching of GET /scores/leaderboard:
+    # - Cache-Control max-age lets clients/CDNs reuse a response (0 = no-cache).
+    # - ETags let clients revalidate with If-None-Match and get a 304 without
+    #   touching the DB. Versions are tracked per process (see LEADERBOARD_INDEX_ENABLED).
+    LEADERBOARD_CACHE_MAX_AGE_SECONDS: int = 5
+    LEADERBOARD_ETAGS_ENABLED: bool = False
+
+    # Cache of serialized leaderboard responses, keyed by (project, board, limit, cursor).
+    # Writes invalidate the project's entries in the worker that handled them;
+    # the TTL bounds how stale other workers can be.
+    LEADERBOARD_RESPONSE_CACHE_ENABLED: bool = True
+    LEADERBOARD_RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    LEADERBOARD_RESPONSE_CACHE_TTL_SECONDS: float = 2
+
+    # Leaderboard snapshots (for huge, write-heavy projects): a background task
+    # re-reads the top LEADERBOARD_SNAPSHOT_SIZE rows of every board read in the
+    # last LEADERBOARD_SNAPSHOT_IDLE_SECONDS, and leaderboard reads that would
+    # query the database are answered from the snapshot while it is younger than
+    # the project's staleness bound: projects.leaderboard_snapshot_max_age_seconds,
+    # else LEADERBOARD_SNAPSHOT_MAX_AGE_SECONDS (None/0 = read live, so by default
+    # only projects given a bound are snapshotted). Read cost then no longer grows
+    # with write volume. Snapshots are kept per worker.
+    LEADERBOARD_SNAPSHOTS_ENABLED: bool = False
+    LEADERBOARD_SNAPSHOT_MAX_AGE_SECONDS: float | None = None
+    LEADERBOARD_SNAPSHOT_SIZE: int = 1000
+    LEADERBOARD_SNAPSHOT_IDLE_SECONDS: float = 300
+
+    # Server-Sent Events leaderboard streams (GET /scores/stream/{project_id}):
+    # changes are pushed at most once per tick, every view is re-read every
+    # refresh interval (catches writes handled by other workers), and each
+    # worker serves at most MAX_SUBSCRIBERS open streams.
+    LEADERBOARD_STREAM_TICK_SECONDS: float = 0.5
+    LEADERBOARD_STREAM_REFRESH_SECONDS: float = 5
+    LEADERBOARD_STREAM_HEARTBEAT_SECONDS: float = 15
+    LEADERBOARD_STREAM_MAX_SUBSCRIBERS: int = 1000
+
+    # Retention of the daily / weekly leaderboard buckets (besides the current
+    # one), enforced by `python -m app.maintenance prune-periods`.
+    LEADERBOARD_DAILY_RETENTION_DAYS: int = 7
+    LEADERBOARD_WEEKLY_RETENTION_WEEKS: int = 4
+
+    # Score history retention, enforced by `python -m app.maintenance maintain-scores`.
+    # Default number of days of `scores` kept per project (None = keep forever);
+    # projects can override it (projects.score_retention_days).
+    SCORES_RETENTION_DAYS: int | None = None
+    # PostgreSQL monthly partitions of `scores` (alembic revision 0006):
+    # partitions created ahead of time, and what happens to expired ones
+    # ("detach" keeps them as scores_archive_YYYY_MM tables, "drop" deletes them).
+    SCORES_PARTITIONS_AHEAD_MONTHS: int = 3
+    SCORES_ARCHIVE_MODE: Literal["detach", "drop"] = "detach"
+
+    # Score ingestion mode for POST /scores/submit:
+    # - sync: insert + commit inside the request (returns the score id)
+    # - queued: validate, enqueue and return 202; a background worker writes
+    #   batches (group commit). Queued scores are lost if the process crashes
+    #   before the worker flushes them.
+    SCORE_INGEST_MODE: Literal["sync", "queued"] = "sync"
+
+    # Max scores waiting in the queue. When full, submits get 503 + Retry-After.
+    SCORE_INGEST_QUEUE_SIZE: int = 10000
+
+    # The worker flushes when it has this many scores...
+    SCORE_INGEST_BATCH_SIZE: int = 500
+
+    # ...or when the oldest queued score has waited this long (seconds).
+    SCORE_INGEST_FLUSH_SECONDS: float = 0.05
+
+    # Per-project token-bucket rate limit on score submissions (a batch of N
+    # scores costs N tokens). Projects can override both values
+    # (projects.rate_limit_per_minute / rate_limit_burst). Throttled submits get
+    # 429 + Retry-After; submit responses carry RateLimit-* headers.
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_SCORES_PER_MINUTE: int = 600
+    RATE_LIMIT_BURST: int = 100
+    # Buckets are per worker by default (a client spread over N workers gets up
+    # to N times the rate). A Redis URL shares them between workers (requires
+    # the `redis` package); while Redis is unreachable, local buckets are used.
+    RATE_LIMIT_REDIS_URL: str | None = None
+    RATE_LIMIT_LOCAL_MAX_BUCKETS: int = 100000
+
+    # Idempotent score submission (Idempotency-Key): keys are stored per project
+    # for IDEMPOTENCY_KEY_RETENTION_HOURS (pruned by `python -m app.maintenance
+    # prune-idempotency-keys`); keep it below the shortest score retention.
+    # Recently used keys are also cached per process, so a retry landing on the
+    # same worker is answered without touching the key table.
+    IDEMPOTENCY_KEY_RETENTION_HOURS: int = 24
+    IDEMPOTENCY_CACHE_SIZE: int = 100000
+    IDEMPOTENCY_CACHE_TTL_SECONDS: float = 600
+
+    # API key -> project resolution cache (per process).
+    # Entries for unknown keys expire faster so new keys are picked up quickly.
+    API_KEY_CACHE_SIZE: int = 10000
+    API_KEY_CACHE_TTL_SECONDS: float = 300
+    API_KEY_CACHE_NEGATIVE_TTL_SECONDS: float = 5
+
+    # Dashboard user cache used to authenticate JWTs without a DB query.
+    # The TTL bounds how long a revoked token keeps working on other workers.
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: float = 30
+
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -6,7 +6,9 @@ from passlib.context import CryptContext
 
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with another cost factor are flagged by needs_update(), so they
+# get rehashed on the next successful login (see verify_and_update_password).
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 JWT_ALG = "HS256"
 
 
@@ -39,21 +41,27 @@ def hash_password(password: str) -> str:
     return pwd_context.hash(_normalize_password(password))
 
 
-def verify_password(password: str, hashed: str) -> bool:
+def verify_and_update_password(password: str, hashed: str) -> tuple[bool, str | None]:
     """
-    Verify a plain password against a stored bcrypt hash.
+    Verify a password and rehash it if the stored hash is outdated.
 
-    - Applies the same normalization rules as hashing.
+    Returns:
+    - (False, None) if the password is wrong
+    - (True, None) if it matches and the hash is current
+    - (True, new_hash) if it matches but was hashed with another cost factor
+      (or scheme); the caller should store new_hash
     """
-    return pwd_context.verify(_normalize_password(password), hashed)
+    return pwd_context.verify_and_update(_normalize_password(password), hashed)
 
 
-def create_access_token(subject: str) -> str:
+def create_access_token(subject: str, user_id: int | None = None, token_version: int | None = None) -> str:
     """
     Create a signed JWT access token.
 
     Claims:
     - sub: subject identifier (username in this project)
+    - uid: user ID (lets the API resolve the user without a username lookup)
+    - tv: token version (tokens with an older version than the user's are revoked)
     - iat: issued-at unix timestamp
     - exp: expiration unix timestamp
 
@@ -69,22 +77,22 @@ def create_access_token(subject: str) -> str:
         "iat": int(now.timestamp()),
         "exp": int(exp.timestamp()),
     }
+    if user_id is not None:
+        payload["uid"] = user_id
+    if token_version is not None:
+        payload["tv"] = token_version
 
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=JWT_ALG)
 
 
-def decode_token(token: str) -> str:
+def decode_token_claims(token: str) -> dict:
     """
-    Decode and validate a JWT token.
-
-    Returns:
-    - The `sub` claim as a string (subject identifier)
+    Decode and validate a JWT token, returning all of its claims.
 
     Raises:
     - JWTError if the token is invalid/expired/missing required claims.
     """
     payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[JWT_ALG])
-    sub = payload.get("sub")
-    if not sub:
+    if not payload.get("sub"):
         raise JWTError("Missing subject")
-    return str(sub)
\ No newline at end of file
+    return payload
@@ -1,12 +1,55 @@
 import hashlib
 import secrets
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Iterable, Iterator, NamedTuple
 
-from sqlalchemy import desc, select
+from sqlalchemy import BigInteger, Select, asc, delete, desc, func, insert, literal, or_, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models import ApiKey, Project, Score
-from app.schemas.projects import ProjectCreate
-from app.schemas.scores import ScoreSubmit
+from app.core.config import settings
+from app.db.replicas import replica_router
+from app.models import ApiKey, BestScore, BestScoreBucket, PeriodBestScore, Project, Score, ScoreIdempotencyKey
+from app.schemas.projects import ProjectCreate, ProjectUpdate
+from app.schemas.scores import LeaderboardMode, ScoreSubmit
+from app.services.cache import MISSING, TTLCache
+from app.services.leaderboard_index import RankedEntry, leaderboard_index
+from app.services.leaderboard_snapshots import leaderboard_snapshots
+from app.services.leaderboard_versions import leaderboard_versions
+from app.services.periods import PERIODS, board_name, period_start
+from app.services.pubsub import LEADERBOARD_CHANNEL, pubsub
+from app.services.rate_limit import RateLimit
+from app.services.response_cache import leaderboard_responses
+
+
+class ProjectRef(NamedTuple):
+    """
+    Minimal project identity resolved from an API key.
+
+    Cheap to cache and safe to share across requests (not bound to a session).
+    Carries the project's rate limit overrides so that enforcing them needs
+    no query beyond the (cached) key resolution.
+    """
+
+    id: int
+    name: str
+    rate_limit_per_minute: int | None = None
+    rate_limit_burst: int | None = None
+
+    @property
+    def rate_limit(self) -> RateLimit:
+        """Score submission token bucket (project overrides, else server defaults)."""
+        per_minute = self.rate_limit_per_minute or settings.RATE_LIMIT_SCORES_PER_MINUTE
+        return RateLimit(rate=per_minute / 60, burst=self.rate_limit_burst or settings.RATE_LIMIT_BURST)
+
+
+# key_hash -> ProjectRef | None (None = unknown key, cached with a shorter TTL)
+_api_key_cache = TTLCache(maxsize=settings.API_KEY_CACHE_SIZE, ttl=settings.API_KEY_CACHE_TTL_SECONDS)
+
+# (project_id, idempotency key) -> scores.id of the committed first submission
+_idempotency_cache = TTLCache(maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_CACHE_TTL_SECONDS)
 
 
 def create_project(db: Session, owner_id: int, project_in: ProjectCreate) -> Project:
@@ -29,6 +72,7 @@ def create_project(db: Session, owner_id: int, project_in: ProjectCreate) -> Pro
     db.add(project)
     db.commit()
     db.refresh(project)
+    replica_router.mark_write(("user", owner_id))
     return project
 
 
@@ -46,6 +90,29 @@ def list_projects(db: Session, owner_id: int) -> list[Project]:
     return db.execute(select(Project).where(Project.owner_id == owner_id)).scalars().all()
 
 
+def update_project(db: Session, project: Project, project_in: ProjectUpdate) -> Project:
+    """
+    Apply a partial update to a project (only fields present in the payload).
+
+    Args:
+        db: SQLAlchemy session.
+        project: Project row (ownership already checked by the caller).
+        project_in: Validated partial payload.
+
+    Returns:
+        The updated Project row.
+    """
+    for field, value in project_in.model_dump(exclude_unset=True).items():
+        setattr(project, field, value)
+    db.commit()
+    db.refresh(project)
+    # Cached ProjectRefs carry the rate limits, snapshots the staleness bound.
+    invalidate_api_key_cache(project_id=project.id)
+    leaderboard_snapshots.forget_project(project.id)
+    replica_router.mark_write(("user", project.owner_id))
+    return project
+
+
 def _hash_api_key(raw: str) -> str:
     """
     Hash an API key for storage/lookup.
@@ -116,36 +183,82 @@ def create_api_key(db: Session, project_id: int) -> tuple[str, ApiKey]:
     db.add(row)
     db.commit()
     db.refresh(row)
+    invalidate_api_key_cache(key_hash=row.key_hash, project_id=project_id)
     return raw_key, row
 
 
-def get_project_by_api_key(db: Session, raw_key: str) -> Project | None:
+def invalidate_api_key_cache(key_hash: str | None = None, project_id: int | None = None) -> None:
+    """
+    Drop cached API key resolutions.
+
+    Call it after any change to `api_keys` (creation, revocation, rotation):
+    - key_hash: forget that key (including a cached "unknown key" result)
+    - project_id: forget every key resolving to that project
+
+    Only the current process is affected; other workers converge within
+    API_KEY_CACHE_TTL_SECONDS.
+    """
+    if key_hash is not None:
+        _api_key_cache.pop(key_hash)
+    if project_id is not None:
+        _api_key_cache.pop_where(lambda _k, ref: ref is not None and ref.id == project_id)
+
+
+def get_project_by_api_key(db: Session, raw_key: str) -> ProjectRef | None:
     """
-    Resolve a Project given a raw API key (X-API-Key header).
+    Resolve a project given a raw API key (X-API-Key header).
 
     Flow:
     - Hash the provided raw key
-    - Look up ApiKey row by key_hash
-    - Load the associated Project
+    - Return the cached resolution if there is one (no DB access)
+    - Otherwise, one joined query on api_keys + projects, then cache the result
 
     Args:
         db: SQLAlchemy session.
         raw_key: Raw API key provided by the client.
 
     Returns:
-        Project row if found, else None.
+        ProjectRef (id, name, rate limits) if found, else None.
     """
     key_hash = _hash_api_key(raw_key)
-    api_key = db.execute(select(ApiKey).where(ApiKey.key_hash == key_hash)).scalar_one_or_none()
-    if not api_key:
+    cached = _api_key_cache.get(key_hash)
+    if cached is not MISSING:
+        return cached
+
+    row = db.execute(
+        select(Project.id, Project.name, Project.rate_limit_per_minute, Project.rate_limit_burst)
+        .join(ApiKey, ApiKey.project_id == Project.id)
+        .where(ApiKey.key_hash == key_hash)
+    ).one_or_none()
+    if row is None:
+        _api_key_cache.set(key_hash, None, ttl=settings.API_KEY_CACHE_NEGATIVE_TTL_SECONDS)
         return None
-    return db.get(Project, api_key.project_id)
+
+    project = ProjectRef(*row)
+    _api_key_cache.set(key_hash, project)
+    return project
 
 
-def submit_score(db: Session, project_id: int, score_in: ScoreSubmit) -> Score:
+def submit_score(db: Session, project_id: int, score_in: ScoreSubmit) -> RankedEntry:
     """
     Persist a submitted score under a project.
 
+    The player's rows in `best_scores` and `period_best_scores` are updated in
+    the same transaction (upsert-if-greater), so the "best", "daily" and
+    "weekly" leaderboards never lag behind `scores`.
+
+    Round trips (no ORM object, no refresh):
+    - INSERT INTO scores ... RETURNING (id, username, value, created_at)
+    - one best_scores upsert and one period_best_scores upsert
+    - when the player's best was raised: one best_score_buckets upsert
+    - COMMIT
+
+    Idempotency:
+    - With `score_in.idempotency_key`, the key is claimed in the same
+      transaction. A retry (same project and key) gets the first submission
+      back and stores nothing; a retry racing the original loses the claim
+      and rolls back.
+
     Security:
     - project_id must come from a trusted source (API key dependency).
       Do NOT accept project_id from the game client body for writes.
@@ -156,35 +269,886 @@ def submit_score(db: Session, project_id: int, score_in: ScoreSubmit) -> Score:
         score_in: Payload with username and score value.
 
     Returns:
-        The persisted Score row.
+        The stored score (or the first submission with the same idempotency key).
     """
-    row = Score(project_id=project_id, username=score_in.username, value=score_in.value)
-    db.add(row)
+    key = score_in.idempotency_key
+    if key is not None:
+        replayed = _replayed_scores(db, project_id, [key], cached_only=True)
+        if replayed:
+            return replayed[key]
+
+    # Core INSERT ... RETURNING rather than an ORM object: one round trip
+    # returns everything the response and the caches need, and the session's
+    # unit of work (identity map, flush bookkeeping) is skipped.
+    entry = RankedEntry(
+        *db.execute(
+            insert(Score)
+            .values(project_id=project_id, username=score_in.username, value=score_in.value)
+            .returning(Score.id, Score.username, Score.value, Score.created_at)
+        ).one()
+    )
+    keys = {}
+    if key is not None:
+        keys = _claim_idempotency_keys(db, project_id, {key: entry.id})
+        if not keys:
+            db.rollback()
+            return _replayed_scores(db, project_id, [key])[key]
+    write = ScoreWrite([entry], {"all": [entry], **_raise_aggregates(db, project_id, [entry])}, keys)
     db.commit()
-    db.refresh(row)
-    return row
+    scores_committed(project_id, write)
+    return entry
+
+
+def submit_scores(db: Session, project_id: int, scores_in: list[ScoreSubmit]) -> list[RankedEntry]:
+    """
+    Persist a batch of scores under a project in a single transaction.
+
+    Round trips:
+    - one multi-row INSERT INTO scores ... RETURNING (SQLAlchemy batches the
+      parameter sets into VALUES lists, keeping the input order)
+    - one multi-row best_scores upsert (one row per player in the batch)
+    - one multi-row period_best_scores upsert (daily and weekly rows together)
+    - when a best was raised: one best_score_buckets upsert (one row per
+      bucket entered or left)
+    - COMMIT
+
+    Args:
+        db: SQLAlchemy session.
+        project_id: Project ID (resolved from API key).
+        scores_in: Validated payloads, in client order.
+
+    Returns:
+        The inserted scores as RankedEntry, in the same order as `scores_in`.
+    """
+    write = insert_scores(db, project_id, scores_in)
+    db.commit()
+    scores_committed(project_id, write)
+    return write.entries
+
+
+class ScoreWrite(NamedTuple):
+    """
+    Outcome of an uncommitted score write, to replay on the in-process caches.
+
+    `boards` maps a board name (see `board_name()`) to the entries that were
+    added to or raised on that board; `keys` maps the idempotency keys claimed
+    by the write to their score id.
+    """
+
+    entries: list[RankedEntry]
+    boards: dict[str, list[RankedEntry]]
+    keys: dict[str, int]
+
+
+def insert_scores(db: Session, project_id: int, scores_in: list[ScoreSubmit]) -> ScoreWrite:
+    """
+    Insert a batch of scores and raise the per-player aggregates, without committing.
+
+    Lets callers group several projects into one transaction (see the
+    write-behind ingestion queue). After committing, the caller must pass the
+    result to `scores_committed()`.
+
+    Items carrying an idempotency key already used in the project (earlier,
+    concurrently, or earlier in the same batch) are not stored again: their
+    entry is the first submission's.
+
+    Returns:
+        ScoreWrite with the stored scores in input order.
+    """
+    keyed = {s.idempotency_key for s in scores_in if s.idempotency_key is not None}
+    replayed = _replayed_scores(db, project_id, keyed, cached_only=True) if keyed else {}
+
+    # Positions of the items to insert: unkeyed ones and the first of each new key.
+    fresh: list[int] = []
+    seen = set(replayed)
+    for i, score_in in enumerate(scores_in):
+        key = score_in.idempotency_key
+        if key is None or key not in seen:
+            fresh.append(i)
+            if key is not None:
+                seen.add(key)
+
+    stmt = insert(Score).returning(
+        Score.id, Score.username, Score.value, Score.created_at, sort_by_parameter_order=True
+    )
+    params = [
+        {"project_id": project_id, "username": scores_in[i].username, "value": scores_in[i].value} for i in fresh
+    ]
+    inserted = [RankedEntry(*r) for r in db.execute(stmt, params)] if params else []
+
+    claims = {
+        scores_in[i].idempotency_key: entry.id
+        for i, entry in zip(fresh, inserted)
+        if scores_in[i].idempotency_key is not None
+    }
+    keys = _claim_idempotency_keys(db, project_id, claims) if claims else {}
+    lost = claims.keys() - keys.keys()
+    if lost:
+        # Claimed meanwhile by another transaction: drop our copies.
+        db.execute(delete(Score).where(Score.id.in_([claims[k] for k in lost])))
+        replayed.update(_replayed_scores(db, project_id, lost))
+
+    entries: list[RankedEntry | None] = [None] * len(scores_in)
+    written = []
+    for i, entry in zip(fresh, inserted):
+        if scores_in[i].idempotency_key not in lost:
+            entries[i] = entry
+            written.append(entry)
+            if scores_in[i].idempotency_key is not None:
+                replayed[scores_in[i].idempotency_key] = entry
+    entries = [e if e is not None else replayed[s.idempotency_key] for e, s in zip(entries, scores_in)]
+    boards = {"all": written, **_raise_aggregates(db, project_id, written)} if written else {}
+    return ScoreWrite(entries, boards, keys)
+
+
+def scores_committed(project_id: int, write: ScoreWrite) -> None:
+    """
+    Propagate committed writes to in-process read structures.
+
+    Must only be called after the transaction that wrote the rows commits.
+
+    Args:
+        project_id: Project ID.
+        write: Result of `insert_scores()` (or of the single-score path).
+    """
+    for key, score_id in write.keys.items():
+        _idempotency_cache.set((project_id, key), score_id)
+    if not write.boards:
+        return  # only retries of earlier submissions
+    for name, entries in write.boards.items():
+        leaderboard_index.add((project_id, name), entries)
+    leaderboard_versions.bump(project_id)
+    leaderboard_responses.invalidate_project(project_id)
+    replica_router.mark_write(("project", project_id))
+    pubsub.publish(LEADERBOARD_CHANNEL, {"project_id": project_id})
+
+
+def replayed_score(db: Session, project_id: int, idempotency_key: str) -> RankedEntry | None:
+    """First submission stored with this idempotency key in the project, or None."""
+    return _replayed_scores(db, project_id, [idempotency_key]).get(idempotency_key)
+
+
+def _claim_idempotency_keys(db: Session, project_id: int, claims: dict[str, int]) -> dict[str, int]:
+    """
+    Record {idempotency key: score id} for a project, skipping keys already taken.
+
+    INSERT ... ON CONFLICT DO NOTHING: if another transaction holds one of
+    the keys uncommitted, this waits for its outcome (PostgreSQL).
+
+    A key whose score is gone (deleted by score retention before the key
+    expired; keys have no FK to `scores`) does not count as taken: it is
+    deleted and claimed again. SQLite reuses the ids of deleted rows, so such
+    a key may point at one of the scores being claimed: those do not count.
+
+    Returns:
+        The claims that were recorded.
+    """
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+
+    def claim(keys: Iterable[str]) -> set[str]:
+        stmt = (
+            dialect.insert(ScoreIdempotencyKey)
+            .values([{"project_id": project_id, "key": k, "score_id": claims[k]} for k in keys])
+            .on_conflict_do_nothing(index_elements=[ScoreIdempotencyKey.project_id, ScoreIdempotencyKey.key])
+            .returning(ScoreIdempotencyKey.key)
+        )
+        return set(db.execute(stmt).scalars())
+
+    claimed = claim(claims)
+    lost = claims.keys() - claimed
+    if lost:
+        db.execute(
+            delete(ScoreIdempotencyKey).where(
+                ScoreIdempotencyKey.project_id == project_id,
+                ScoreIdempotencyKey.key.in_(lost),
+                ~select(Score.id)
+                .where(Score.id == ScoreIdempotencyKey.score_id, Score.id.not_in(claims.values()))
+                .exists(),
+            )
+        )
+        # Claimed again even if nothing was deleted here: a concurrent retry
+        # may have deleted the stale key first, and holds the new one uncommitted.
+        claimed |= claim(lost)
+    return {key: claims[key] for key in claimed}
+
+
+def _replayed_scores(
+    db: Session, project_id: int, keys: Iterable[str], cached_only: bool = False
+) -> dict[str, RankedEntry]:
+    """
+    First submissions of the given idempotency keys: {key: entry}.
+
+    Keys are resolved from the per-process cache, then (unless `cached_only`)
+    from `score_idempotency_keys`; unknown keys are left out.
+    """
+    ids: dict[str, int] = {}
+    missing = []
+    for key in keys:
+        score_id = _idempotency_cache.get((project_id, key))
+        if score_id is MISSING:
+            missing.append(key)
+        else:
+            ids[key] = score_id
+    if missing and not cached_only:
+        found = db.execute(
+            select(ScoreIdempotencyKey.key, ScoreIdempotencyKey.score_id).where(
+                ScoreIdempotencyKey.project_id == project_id, ScoreIdempotencyKey.key.in_(missing)
+            )
+        )
+        ids.update(found.tuples().all())
+    if not ids:
+        return {}
+
+    rows = db.execute(
+        select(Score.id, Score.username, Score.value, Score.created_at).where(
+            Score.project_id == project_id, Score.id.in_(set(ids.values()))
+        )
+    )
+    by_id = {r.id: RankedEntry(*r) for r in rows}
+    replayed = {}
+    for key, score_id in ids.items():
+        if score_id in by_id:
+            _idempotency_cache.set((project_id, key), score_id)
+            replayed[key] = by_id[score_id]
+    return replayed
+
+
+def _raise_aggregates(db: Session, project_id: int, entries: list[RankedEntry]) -> dict[str, list[RankedEntry]]:
+    """
+    Raise best_scores and the current daily/weekly buckets for new scores.
+
+    Returns:
+        {board name: rows inserted or raised} for "best" and each bucket touched.
+    """
+    # Best entry per player (and per bucket) within the batch; the first one
+    # wins ties, like the upsert.
+    best: dict[str, RankedEntry] = {}
+    buckets: dict[tuple[str, date, str], RankedEntry] = {}
+    for entry in entries:
+        current = best.get(entry.username)
+        if current is None or entry.value > current.value:
+            best[entry.username] = entry
+        for period in PERIODS:
+            key = (period, period_start(period, entry.created_at), entry.username)
+            current = buckets.get(key)
+            if current is None or entry.value > current.value:
+                buckets[key] = entry
+
+    boards: dict[str, list[RankedEntry]] = {}
+    raised_best = _upsert_if_greater(
+        db,
+        BestScore,
+        [BestScore.project_id, BestScore.username],
+        [_aggregate_row(project_id, e) for e in best.values()],
+        BestScore.previous_value,
+    )
+    boards["best"] = [RankedEntry(*entry) for _, *entry in raised_best]
+    raised = _upsert_if_greater(
+        db,
+        PeriodBestScore,
+        [PeriodBestScore.project_id, PeriodBestScore.period, PeriodBestScore.period_start, PeriodBestScore.username],
+        [
+            {**_aggregate_row(project_id, e), "period": period, "period_start": start}
+            for (period, start, _), e in buckets.items()
+        ],
+        PeriodBestScore.period,
+        PeriodBestScore.period_start,
+    )
+    for period, start, *entry in raised:
+        boards.setdefault(f"{period}:{start.isoformat()}", []).append(RankedEntry(*entry))
+    # Last: bucket rows are shared by many players, so take their locks after
+    # every per-player row lock (no lock cycle through them).
+    if raised_best:
+        _move_bucket_counts(db, project_id, [(previous, value) for previous, _, _, value, _ in raised_best])
+    return boards
+
+
+def _aggregate_row(project_id: int, entry: RankedEntry) -> dict:
+    return {
+        "project_id": project_id,
+        "username": entry.username,
+        "value": entry.value,
+        "score_id": entry.id,
+        "created_at": entry.created_at,
+    }
+
+
+# Sub-buckets per power of two in `score_bucket()`.
+SCORE_BUCKET_BITS = 6
+
+
+def score_bucket(value: int) -> int:
+    """
+    Log-scaled bucket of a score value (best_score_buckets), increasing with the value.
+
+    Values below 2**SCORE_BUCKET_BITS get a bucket each; above, each power of
+    two is split into 2**SCORE_BUCKET_BITS buckets, so a bucket spans at most
+    1/64 of its values. Negative values mirror positive ones. The whole
+    32-bit range fits in about 3,300 buckets.
+    """
+    if value < 0:
+        return -1 - score_bucket(-1 - value)
+    shift = max(value.bit_length() - SCORE_BUCKET_BITS - 1, 0)
+    return (shift << SCORE_BUCKET_BITS) + (value >> shift)
+
+
+def score_bucket_start(bucket: int) -> int:
+    """Smallest value of `bucket` (inverse of `score_bucket()`)."""
+    if bucket < 0:
+        return -score_bucket_start(-bucket)
+    size = 1 << SCORE_BUCKET_BITS
+    if bucket < 2 * size:
+        return bucket
+    shift = bucket // size - 1
+    return (bucket - shift * size) << shift
+
+
+def _move_bucket_counts(db: Session, project_id: int, moves: list[tuple[int | None, int]]) -> None:
+    """
+    Apply raised best scores to best_score_buckets.
+
+    Each (previous value or None for a new player, new value) adds one player
+    to the new value's bucket and removes one from the previous value's.
+    Rows are written in bucket order, so concurrent writers lock them in the
+    same order.
+    """
+    deltas: dict[int, int] = {}
+    for previous, value in moves:
+        bucket = score_bucket(value)
+        deltas[bucket] = deltas.get(bucket, 0) + 1
+        if previous is not None:
+            bucket = score_bucket(previous)
+            deltas[bucket] = deltas.get(bucket, 0) - 1
+    rows = [
+        {"project_id": project_id, "bucket": bucket, "players": delta}
+        for bucket, delta in sorted(deltas.items())
+        if delta
+    ]
+    if rows:
+        db.connection().execute(_bucket_count_statement(db.get_bind().dialect.name), rows)
+
+
+@lru_cache(maxsize=None)
+def _bucket_count_statement(dialect_name: str):
+    """INSERT ... ON CONFLICT DO UPDATE adding to best_score_buckets.players (built once per dialect)."""
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    stmt = dialect.insert(BestScoreBucket)
+    return stmt.on_conflict_do_update(
+        index_elements=[BestScoreBucket.project_id, BestScoreBucket.bucket],
+        set_={"players": BestScoreBucket.players + stmt.excluded.players},
+    )
+
+
+def _upsert_if_greater(db: Session, table, conflict_columns: list, rows: list[dict], *extra_columns) -> list:
+    """
+    Raise per-player aggregate rows, keeping the current row when it is not beaten.
+
+    Emits a single INSERT ... ON CONFLICT (<conflict_columns>) DO UPDATE
+    ... WHERE <table>.value < excluded.value. Each conflict key must appear at
+    most once in `rows` (PostgreSQL refuses to update the same row twice in one
+    statement).
 
+    Args:
+        db: SQLAlchemy session (the caller commits).
+        table: BestScore or PeriodBestScore.
+        conflict_columns: Columns of the table's unique constraint.
+        rows: Dicts with project_id, username, value, score_id, created_at
+            (plus any other column of the conflict key).
+        extra_columns: Columns returned ahead of the RankedEntry fields.
+
+    Returns:
+        The rows that were inserted or raised: RankedEntry, or plain rows of
+        (*extra_columns, id, username, value, created_at) when extra columns
+        are requested.
+    """
+    stmt = _upsert_statement(db.get_bind().dialect.name, table, tuple(conflict_columns), extra_columns)
+    # Parameter sets rather than .values(rows): the statement stays the same
+    # object whatever the batch size, and SQLAlchemy still sends a batch as
+    # one multi-row INSERT (insertmanyvalues). Core execution on the session's
+    # connection skips the ORM bulk-insert setup.
+    result = db.connection().execute(stmt, rows)
+    if extra_columns:
+        return result.all()
+    return [RankedEntry(*r) for r in result]
+
+
+@lru_cache(maxsize=None)
+def _upsert_statement(dialect_name: str, table, conflict_columns: tuple, extra_columns: tuple):
+    """
+    Build the `_upsert_if_greater()` statement once per table and dialect.
+
+    The dialect INSERT ... ON CONFLICT constructs are not cacheable by
+    SQLAlchemy (they are compiled on every execution); at least their
+    construction, which costs about as much, is not repeated.
+    """
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    stmt = dialect.insert(table)
+    set_ = {
+        "value": stmt.excluded.value,
+        "score_id": stmt.excluded.score_id,
+        "created_at": stmt.excluded.created_at,
+    }
+    if "previous_value" in table.__table__.c:
+        # The row being replaced, as locked by the upsert: exact under
+        # concurrent writers, unlike a read before the statement.
+        set_["previous_value"] = table.value
+    return stmt.on_conflict_do_update(
+        index_elements=list(conflict_columns),
+        set_=set_,
+        where=table.value < stmt.excluded.value,
+    ).returning(*extra_columns, table.id, table.username, table.value, table.created_at)
+
+
+# Table backing each leaderboard mode. All share the same column layout and a
+# covering index ending in (value DESC, created_at DESC, id DESC).
+_MODE_TABLES = {"all": Score, "best": BestScore, "daily": PeriodBestScore, "weekly": PeriodBestScore}
+
+
+def _board_filter(table, project_id: int, board: str) -> list:
+    """WHERE clauses selecting one board (a project, plus a bucket for windowed modes)."""
+    clauses = [table.project_id == project_id]
+    if table is PeriodBestScore:
+        period, start = board.split(":", 1)
+        clauses += [table.period == period, table.period_start == date.fromisoformat(start)]
+    return clauses
+
+
+def _top_scores(
+    db: Session,
+    project_id: int,
+    limit: int,
+    board: str = "all",
+    after: RankedEntry | None = None,
+) -> list[RankedEntry]:
+    """
+    Run the top-N query against the database.
 
-def leaderboard(db: Session, project_id: int, limit: int = 20) -> list[Score]:
+    Only columns present in the leaderboard covering index are selected (key
+    columns plus the INCLUDE'd username), so PostgreSQL can use an index-only
+    scan and no ORM objects are built. With `after`, the scan starts right
+    below that entry (keyset pagination): a bounded range scan at any depth.
     """
-    Fetch the top scores for a project.
+    table = _MODE_TABLES[board.split(":", 1)[0]]
+    stmt = (
+        select(table.id, table.username, table.value, table.created_at)
+        .where(*_board_filter(table, project_id, board))
+        .order_by(desc(table.value), desc(table.created_at), desc(table.id))
+        .limit(limit)
+    )
+    if after is not None:
+        stmt = stmt.where(_ranks_below(db, table, after))
+    return [RankedEntry(*row) for row in db.execute(stmt)]
+
+
+def leaderboard(
+    db: Session,
+    project_id: int,
+    limit: int = 20,
+    mode: LeaderboardMode = "all",
+    after: RankedEntry | None = None,
+) -> list[RankedEntry]:
+    """
+    Fetch the top scores for a project, or the page following `after`.
+
+    Modes:
+    - all: every submitted score (reads `scores`)
+    - best: best score per player (reads the materialized `best_scores`)
+    - daily / weekly: best score per player in the current UTC bucket (reads
+      one bucket of `period_best_scores`, same cost as `best`)
 
     Ordering:
     - Higher score first
-    - If tied, newer scores first (created_at desc)
+    - If tied, newer scores first (created_at desc), then higher id first
+
+    Read path:
+    - If the in-memory index is enabled and `limit` fits its capacity, the rows
+      come from memory (no DB round trip once the board is warm).
+    - The first read of a board warms it with a single top-K query; a board
+      older than LEADERBOARD_INDEX_MAX_AGE_SECONDS is warmed again, so rows
+      deleted by score retention (or written by other workers) do not linger.
+    - Pages after a cursor are sliced from a warm board while they stay above
+      its cut-off, otherwise read with a keyset range scan.
+    - Anything else falls back to the database query, unless the board has a
+      snapshot within the project's staleness bound (leaderboard snapshots).
 
     Args:
         db: SQLAlchemy session.
         project_id: Project ID.
         limit: Max number of results.
+        mode: Leaderboard mode.
+        after: Last entry of the previous page (from a decoded cursor).
 
     Returns:
-        List of Score rows.
+        List of RankedEntry rows (username, value and tie-break fields).
+    """
+    board = board_name(mode)
+    board_key = (project_id, board)
+    expire_index_board(project_id, board)
+    if after is not None:
+        page = leaderboard_index.after(board_key, after, limit) if leaderboard_index.can_serve(limit) else None
+        return page if page is not None else _read_board(db, project_id, limit, board, after)
+
+    if not leaderboard_index.can_serve(limit):
+        return _read_board(db, project_id, limit, board)
+
+    cached = leaderboard_index.top(board_key, limit)
+    if cached is not None:
+        return cached
+
+    if not leaderboard_index.begin_warm(board_key, unique=mode != "all"):
+        # Another request is warming this board: do not wait for it.
+        return _read_board(db, project_id, limit, board)
+
+    if board != mode:
+        # New bucket: drop the boards of previous buckets of this mode.
+        leaderboard_index.discard(
+            lambda key: key[0] == project_id and key[1].startswith(f"{mode}:") and key[1] != board
+        )
+
+    try:
+        rows = _top_scores(db, project_id, leaderboard_index.capacity, board)
+    except Exception:
+        leaderboard_index.abort_warm(board_key)
+        raise
+    leaderboard_index.finish_warm(board_key, rows)
+    warmed = leaderboard_index.top(board_key, limit)
+    return warmed if warmed is not None else rows[:limit]
+
+
+def expire_index_board(project_id: int, board: str) -> None:
     """
+    Drop a board from the in-memory index once it is older than its max age.
+
+    The re-read may differ from what the index served (rows pruned or archived
+    since it was warmed), so the project's cached responses and ETags go too.
+    Callers answering from those caches must call this before checking them.
+    """
+    if leaderboard_index.expire((project_id, board)):
+        leaderboard_versions.bump(project_id)
+        leaderboard_responses.invalidate_project(project_id)
+
+
+def _read_board(
+    db: Session, project_id: int, limit: int, board: str, after: RankedEntry | None = None
+) -> list[RankedEntry]:
+    """Top-N (or keyset page) from the board's snapshot if fresh enough, else from the database."""
+    rows = leaderboard_snapshots.get((project_id, board), limit, after)
+    return rows if rows is not None else _top_scores(db, project_id, limit, board, after)
+
+
+def leaderboard_snapshot(db: Session, project_id: int, board: str, size: int) -> tuple[float | None, list[RankedEntry]]:
+    """
+    Load a leaderboard snapshot: the project's staleness bound and the board's top `size`.
+
+    The bound is projects.leaderboard_snapshot_max_age_seconds, else
+    LEADERBOARD_SNAPSHOT_MAX_AGE_SECONDS. It is None, and no rows are read,
+    when the project reads live (no bound, or 0) or no longer exists.
+    """
+    row = db.execute(
+        select(Project.leaderboard_snapshot_max_age_seconds).where(Project.id == project_id)
+    ).one_or_none()
+    if row is None:
+        return None, []
+    max_age = row[0] if row[0] is not None else settings.LEADERBOARD_SNAPSHOT_MAX_AGE_SECONDS
+    if not max_age:
+        return None, []
+    return max_age, _top_scores(db, project_id, size, board)
+
+
+# Rows fetched per server-side cursor round trip by export queries.
+EXPORT_CHUNK_ROWS = 1000
+
+
+def iter_leaderboard(
+    db: Session,
+    project_id: int,
+    mode: LeaderboardMode = "all",
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> Iterator[list[RankedEntry]]:
+    """
+    Stream a whole leaderboard, in ranking order, as chunks of entries.
+
+    The query runs with `yield_per`, i.e. through a server-side cursor on
+    PostgreSQL (`stream_results`): at most `chunk_rows` rows are held in memory
+    at a time, whatever the size of the project. Rows come from one statement,
+    so the dump is a consistent snapshot. The session's connection stays busy
+    until the iterator is exhausted or closed.
+
+    Args:
+        db: SQLAlchemy session (dedicated to the export).
+        project_id: Project ID.
+        mode: Leaderboard mode.
+        chunk_rows: Rows per chunk (and per cursor fetch).
+
+    Yields:
+        Lists of up to `chunk_rows` RankedEntry.
+    """
+    board = board_name(mode)
+    table = _MODE_TABLES[mode]
     stmt = (
-        select(Score)
-        .where(Score.project_id == project_id)
-        .order_by(desc(Score.value), desc(Score.created_at))
-        .limit(limit)
+        select(table.id, table.username, table.value, table.created_at)
+        .where(*_board_filter(table, project_id, board))
+        .order_by(desc(table.value), desc(table.created_at), desc(table.id))
+    )
+    result = db.execute(stmt, execution_options={"yield_per": chunk_rows})
+    try:
+        for rows in result.partitions():
+            yield [RankedEntry(*row) for row in rows]
+    finally:
+        result.close()
+
+
+def prune_period_scores(db: Session, now: datetime | None = None) -> dict[str, int]:
+    """
+    Delete daily/weekly buckets that fell out of their retention window.
+
+    Keeps the current bucket plus LEADERBOARD_DAILY_RETENTION_DAYS previous
+    days and LEADERBOARD_WEEKLY_RETENTION_WEEKS previous weeks. Each DELETE is
+    a range on ix_period_best_scores_expiry.
+
+    Returns:
+        {period: rows deleted}
+    """
+    keep = {
+        "daily": timedelta(days=settings.LEADERBOARD_DAILY_RETENTION_DAYS),
+        "weekly": timedelta(weeks=settings.LEADERBOARD_WEEKLY_RETENTION_WEEKS),
+    }
+    deleted = {}
+    for period in PERIODS:
+        cutoff = period_start(period, now) - keep[period]
+        result = db.execute(
+            delete(PeriodBestScore).where(PeriodBestScore.period == period, PeriodBestScore.period_start < cutoff)
+        )
+        deleted[period] = result.rowcount
+    db.commit()
+    return deleted
+
+
+def prune_idempotency_keys(db: Session, now: datetime) -> int:
+    """
+    Delete idempotency keys older than IDEMPOTENCY_KEY_RETENTION_HOURS.
+
+    Returns:
+        Number of keys deleted.
+    """
+    cutoff = now - timedelta(hours=settings.IDEMPOTENCY_KEY_RETENTION_HOURS)
+    result = db.execute(delete(ScoreIdempotencyKey).where(ScoreIdempotencyKey.created_at < cutoff))
+    db.commit()
+    return result.rowcount
+
+
+def _retention_groups(db: Session) -> dict[int | None, Select]:
+    """
+    Projects grouped by effective retention: {days (None = forever): project id subquery}.
+
+    Projects without an override share SCORES_RETENTION_DAYS, so one DELETE per
+    distinct retention value covers every project.
+    """
+    default = settings.SCORES_RETENTION_DAYS
+    groups: dict[int | None, list] = {}
+    for days in db.execute(select(Project.score_retention_days).distinct()).scalars():
+        condition = Project.score_retention_days.is_(None) if days is None else Project.score_retention_days == days
+        groups.setdefault(default if days is None else days, []).append(condition)
+    return {days: select(Project.id).where(or_(*conditions)) for days, conditions in groups.items()}
+
+
+def scores_expired_before(db: Session, now: datetime) -> datetime | None:
+    """
+    Instant before which no project keeps scores (the partition archiving cutoff).
+
+    Returns None when at least one project keeps its whole history.
+    """
+    retentions = list(_retention_groups(db))
+    if not retentions or None in retentions:
+        return None
+    return now - timedelta(days=max(retentions))
+
+
+def prune_expired_scores(db: Session, now: datetime) -> int:
+    """
+    Delete scores older than their project's retention period.
+
+    Runs one DELETE per distinct retention value. On a partitioned `scores`,
+    the created_at bound prunes the scan to the old partitions; whole expired
+    months are normally detached first (see app/db/partitions.py), so this
+    only trims the partial months and projects with a shorter retention.
+    Aggregates (best_scores, period_best_scores) are kept; the idempotency
+    keys of the deleted scores go with them.
+
+    Returns:
+        Number of rows deleted.
+    """
+    deleted = 0
+    for days, project_ids in _retention_groups(db).items():
+        if days is None:
+            continue
+        expired = (Score.created_at < now - timedelta(days=days), Score.project_id.in_(project_ids))
+        db.execute(
+            delete(ScoreIdempotencyKey).where(ScoreIdempotencyKey.score_id.in_(select(Score.id).where(*expired)))
+        )
+        result = db.execute(delete(Score).where(*expired))
+        deleted += result.rowcount
+    db.commit()
+    return deleted
+
+
+def _sort_keys(db: Session, table, entry: RankedEntry):
+    """
+    (row key, entry key) row values on (value, created_at, id) for keyset predicates.
+
+    A row-value comparison maps to a single range on the
+    (..., value DESC, created_at DESC, id DESC) covering indexes. On SQLite,
+    timestamps are compared through datetime(): CURRENT_TIMESTAMP is stored
+    without fractional seconds while bound datetimes carry them, which would
+    break ties (dev only; PostgreSQL compares timestamps natively).
+    """
+    created_at = table.created_at
+    bound = literal(entry.created_at, type_=table.created_at.type)
+    if db.get_bind().dialect.name == "sqlite":
+        created_at, bound = func.datetime(created_at), func.datetime(bound)
+    return tuple_(table.value, created_at, table.id), tuple_(entry.value, bound, entry.id)
+
+
+def _ranks_above(db: Session, table, entry: RankedEntry):
+    """Keyset predicate: rows ranked strictly above `entry`."""
+    row_key, entry_key = _sort_keys(db, table, entry)
+    return row_key > entry_key
+
+
+def _ranks_below(db: Session, table, entry: RankedEntry):
+    """Keyset predicate: rows ranked strictly below `entry`."""
+    row_key, entry_key = _sort_keys(db, table, entry)
+    return row_key < entry_key
+
+
+def player_rank(
+    db: Session,
+    project_id: int,
+    username: str,
+    radius: int = 5,
+) -> tuple[int, RankedEntry, list[tuple[int, RankedEntry]]] | None:
+    """
+    Find a player's rank on the best-per-player leaderboard, with neighbors.
+
+    Read path:
+    - If the player is on the warm in-memory "best" board, the answer is a
+      binary search on the sorted array (O(log n), no DB round trip).
+    - Otherwise: a unique-key lookup of the player's best row, the rank query,
+      and two bounded range scans (up to `radius` rows above and below).
+    - The rank is the sum of the best_score_buckets counts above the player's
+      bucket (a few thousand rows at most, whatever the rank) plus an index
+      range COUNT of the players above them within their bucket (values
+      within 1/64 of theirs). Its cost does not grow with the rank, but a
+      crowded bucket is still counted row by row.
+
+    Args:
+        db: SQLAlchemy session.
+        project_id: Project ID.
+        username: Player name.
+        radius: Neighbors to return on each side of the player.
+
+    Returns:
+        (rank, player's best entry, [(rank, entry), ...] around the player),
+        or None if the player has no score in this project.
+    """
+    expire_index_board(project_id, "best")
+    window = leaderboard_index.around((project_id, "best"), username, radius)
+    if window is not None:
+        start, entries = window
+        ranked = [(start + i, e) for i, e in enumerate(entries)]
+        me = next((r, e) for r, e in ranked if e.username == username)
+        return me[0], me[1], ranked
+
+    row = db.execute(
+        select(BestScore.id, BestScore.username, BestScore.value, BestScore.created_at).where(
+            BestScore.project_id == project_id, BestScore.username == username
+        )
+    ).one_or_none()
+    if row is None:
+        return None
+    me = RankedEntry(*row)
+
+    columns = (BestScore.id, BestScore.username, BestScore.value, BestScore.created_at)
+    in_project = BestScore.project_id == project_id
+    bucket = score_bucket(me.value)
+    # BIGINT: the end of the top bucket can exceed the INTEGER column range.
+    bucket_end = literal(score_bucket_start(bucket + 1), type_=BigInteger)
+    in_buckets_above = (
+        select(func.coalesce(func.sum(BestScoreBucket.players), 0))
+        .where(BestScoreBucket.project_id == project_id, BestScoreBucket.bucket > bucket)
+        .scalar_subquery()
+    )
+    in_bucket_above = (
+        select(func.count())
+        .select_from(BestScore)
+        .where(in_project, _ranks_above(db, BestScore, me), BestScore.value < bucket_end)
+        .scalar_subquery()
     )
-    return db.execute(stmt).scalars().all()
\ No newline at end of file
+    rank = db.execute(select(in_buckets_above + in_bucket_above)).scalar_one() + 1
+
+    above = db.execute(
+        select(*columns)
+        .where(in_project, _ranks_above(db, BestScore, me))
+        .order_by(asc(BestScore.value), asc(BestScore.created_at), asc(BestScore.id))
+        .limit(radius)
+    ).all()
+    below = db.execute(
+        select(*columns)
+        .where(in_project, _ranks_below(db, BestScore, me))
+        .order_by(desc(BestScore.value), desc(BestScore.created_at), desc(BestScore.id))
+        .limit(radius)
+    ).all()
+
+    entries = [RankedEntry(*r) for r in reversed(above)] + [me] + [RankedEntry(*r) for r in below]
+    start = rank - len(above)
+    return rank, me, [(start + i, e) for i, e in enumerate(entries)]
+
+
+# ---------------------------------------------------------------------------
+# Async variants (used by the async score routes).
+#
+# Each one runs the sync implementation above through AsyncSession.run_sync():
+# the code executes in a greenlet whose I/O goes through the asyncio driver,
+# so the event loop is never blocked and the query/caching logic exists once.
+# ---------------------------------------------------------------------------
+
+
+async def get_project_by_api_key_async(db: AsyncSession, raw_key: str) -> ProjectRef | None:
+    """Async variant of get_project_by_api_key()."""
+    return await db.run_sync(get_project_by_api_key, raw_key)
+
+
+async def submit_score_async(db: AsyncSession, project_id: int, score_in: ScoreSubmit) -> RankedEntry:
+    """Async variant of submit_score()."""
+    return await db.run_sync(submit_score, project_id, score_in)
+
+
+async def replayed_score_async(db: AsyncSession, project_id: int, idempotency_key: str) -> RankedEntry | None:
+    """Async variant of replayed_score()."""
+    return await db.run_sync(replayed_score, project_id, idempotency_key)
+
+
+async def submit_scores_async(db: AsyncSession, project_id: int, scores_in: list[ScoreSubmit]) -> list[RankedEntry]:
+    """Async variant of submit_scores()."""
+    return await db.run_sync(submit_scores, project_id, scores_in)
+
+
+async def leaderboard_async(
+    db: AsyncSession,
+    project_id: int,
+    limit: int = 20,
+    mode: LeaderboardMode = "all",
+    after: RankedEntry | None = None,
+) -> list[RankedEntry]:
+    """Async variant of leaderboard()."""
+    return await db.run_sync(leaderboard, project_id, limit, mode, after)
+
+
+async def player_rank_async(
+    db: AsyncSession,
+    project_id: int,
+    username: str,
+    radius: int = 5,
+) -> tuple[int, RankedEntry, list[tuple[int, RankedEntry]]] | None:
+    """Async variant of player_rank()."""
+    return await db.run_sync(player_rank, project_id, username, radius)
@@ -1,9 +1,29 @@
-from sqlalchemy import select
+from typing import NamedTuple
+
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
-from app.core.security import hash_password, verify_password
+from app.core.config import settings
+from app.core.security import hash_password
 from app.models import User
 from app.schemas.auth import UserCreate
+from app.services.cache import MISSING, TTLCache
+
+
+class AuthUser(NamedTuple):
+    """
+    Identity of an authenticated dashboard user.
+
+    Cached between requests, so it only carries what authorization needs.
+    """
+
+    id: int
+    username: str
+    token_version: int
+
+
+# user_id -> AuthUser | None
+_user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
 
 
 def get_user_by_username(db: Session, username: str) -> User | None:
@@ -34,7 +54,7 @@ def get_user_by_email(db: Session, email: str) -> User | None:
     return db.execute(select(User).where(User.email == email)).scalar_one_or_none()
 
 
-def create_user(db: Session, user_in: UserCreate) -> User:
+def create_user(db: Session, user_in: UserCreate, hashed_password: str | None = None) -> User:
     """
     Create and persist a new user.
 
@@ -45,6 +65,8 @@ def create_user(db: Session, user_in: UserCreate) -> User:
     Args:
         db: SQLAlchemy session.
         user_in: Validated input payload (username/email/password).
+        hashed_password: Hash of user_in.password computed by the caller (e.g.
+            in the password hashing pool); hashed here when omitted.
 
     Returns:
         Persisted User row.
@@ -52,7 +74,7 @@ def create_user(db: Session, user_in: UserCreate) -> User:
     user = User(
         username=user_in.username,
         email=user_in.email,
-        hashed_password=hash_password(user_in.password),
+        hashed_password=hashed_password or hash_password(user_in.password),
     )
     db.add(user)
     db.commit()
@@ -60,24 +82,47 @@ def create_user(db: Session, user_in: UserCreate) -> User:
     return user
 
 
-def authenticate_user(db: Session, username: str, password: str) -> User | None:
+def set_password_hash(db: Session, user: User, hashed_password: str) -> None:
+    """
+    Store a new password hash for a user (e.g. a rehash with the current cost).
+
+    Does not bump token_version: the password itself is unchanged.
+    """
+    user.hashed_password = hashed_password
+    db.commit()
+
+
+def get_auth_user(db: Session, user_id: int) -> AuthUser | None:
     """
-    Authenticate a user by username and password.
+    Resolve a user's identity by ID, from the cache when possible.
 
-    Behavior:
-    - Looks up the user by username.
-    - Verifies the submitted password against the stored hash.
-    - Returns the user on success, otherwise None.
+    Args:
+        db: SQLAlchemy session (only used on a cache miss).
+        user_id: User ID (the JWT `uid` claim).
 
-    Security note (user enumeration):
-    - This returns None both when the user does not exist and when the password is wrong.
-      That keeps the calling layer free to respond with a single "Invalid credentials" message.
+    Returns:
+        AuthUser if the user exists, otherwise None.
     """
-    user = get_user_by_username(db, username)
-    if not user:
-        return None
+    cached = _user_cache.get(user_id)
+    if cached is not MISSING:
+        return cached
+
+    row = db.execute(
+        select(User.id, User.username, User.token_version).where(User.id == user_id)
+    ).one_or_none()
+    user = AuthUser(*row) if row else None
+    _user_cache.set(user_id, user)
+    return user
+
 
-    if not verify_password(password, user.hashed_password):
-        return None
+def revoke_user_tokens(db: Session, user_id: int) -> None:
+    """
+    Revoke every access token issued to a user so far.
 
-    return user
\ No newline at end of file
+    Bumps `token_version`; tokens carrying an older `tv` claim are rejected.
+    The cache entry is dropped in this process; other workers pick the new
+    version up within USER_CACHE_TTL_SECONDS.
+    """
+    db.execute(update(User).where(User.id == user_id).values(token_version=User.token_version + 1))
+    db.commit()
+    _user_cache.pop(user_id)
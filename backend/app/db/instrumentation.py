@@ -0,0 +1,95 @@
+"""
+Per-request SQL accounting through SQLAlchemy engine events.
+
+`instrument_engine()` hooks before/after_cursor_execute on an engine: every
+statement is timed into a global histogram and, when a request is being
+tracked (see `track_queries()`), added to that request's QueryStats.
+
+The current QueryStats lives in a context variable. Starlette's threadpool,
+AsyncSession.run_sync() greenlets and StreamingResponse iterators all run
+with a copy of the request's context, so statements executed there are
+attributed to the right request, including on the sync engine.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.services.metrics import Histogram, registry
+
+DB_QUERY_DURATION = registry.register(
+    Histogram(
+        "scoreforge_db_query_duration_seconds",
+        "Time spent executing SQL statements (driver round trip).",
+        labelnames=("engine",),
+    )
+)
+
+
+class QueryStats:
+    """
+    SQL statements executed on behalf of one request.
+
+    With `capture`, the statement texts (without parameters) and their
+    durations are kept too, up to `max_statements`, for the slow-request log.
+    """
+
+    __slots__ = ("count", "seconds", "capture", "max_statements", "statements")
+
+    def __init__(self, capture: bool = False, max_statements: int = 0) -> None:
+        self.count = 0
+        self.seconds = 0.0
+        self.capture = capture
+        self.max_statements = max_statements
+        self.statements: list[tuple[str, float]] = []
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        if self.capture and len(self.statements) < self.max_statements:
+            self.statements.append((statement, seconds))
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries(capture: bool = False, max_statements: int = 0) -> Iterator[QueryStats]:
+    """Attribute the statements executed in this context to a new QueryStats."""
+    stats = QueryStats(capture, max_statements)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Time every statement run on `engine` (label `engine=name`).
+
+    For an AsyncEngine, pass its `sync_engine`.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        DB_QUERY_DURATION.observe(elapsed, engine=name)
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        # The statement failed: after_cursor_execute will not run for it.
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
@@ -0,0 +1,140 @@
+"""
+Monthly range partitions of the `scores` table (PostgreSQL only).
+
+Alembic revision 0006 turns `scores` into a table partitioned by
+RANGE (created_at), with one partition per UTC month named `scores_pYYYY_MM`.
+Inserts are routed to the current month, so writes only maintain the indexes
+of a small, hot partition, and expired months are removed with a cheap
+DETACH/DROP instead of a DELETE + vacuum over the whole history.
+
+Reads do not all benefit: the `mode=all` top-N has no created_at bound, so
+PostgreSQL merges one index probe per attached partition (Merge Append). Its
+cost grows with the number of retained months, not with their size; keep
+SCORE_RETENTION_DAYS bounded. The best / daily / weekly boards and ranks read
+the aggregate tables and never touch `scores`.
+
+These helpers are driven by `python -m app.maintenance maintain-scores`.
+On SQLite, or on a PostgreSQL database that was not migrated, `scores` is a
+plain table and they do nothing.
+"""
+
+from datetime import date, datetime, timezone
+from typing import Literal
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+PARENT = "scores"
+ArchiveMode = Literal["detach", "drop"]
+
+
+def month_start(d: date) -> date:
+    return d.replace(day=1)
+
+
+def add_months(d: date, months: int) -> date:
+    """First day of the month `months` after the month of `d`."""
+    index = d.year * 12 + (d.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_p{month:%Y_%m}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    """True if `scores` is a partitioned table on this database."""
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(
+        conn.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :name AND c.relnamespace = to_regnamespace(current_schema())::oid"
+            ),
+            {"name": PARENT},
+        ).first()
+    )
+
+
+def attached_partitions(conn: Connection) -> dict[date, str]:
+    """{first day of the month: partition table name} for attached monthly partitions."""
+    rows = conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :name AND p.relnamespace = to_regnamespace(current_schema())::oid"
+        ),
+        {"name": PARENT},
+    ).scalars()
+    partitions = {}
+    for name in rows:
+        try:
+            month = datetime.strptime(name, f"{PARENT}_p%Y_%m").date()
+        except ValueError:
+            continue  # not created by us (e.g. a manually attached partition)
+        partitions[month] = name
+    return partitions
+
+
+def ensure_partitions(conn: Connection, months_ahead: int, today: date | None = None) -> list[str]:
+    """
+    Create the partitions of the current month and the next `months_ahead` months.
+
+    Without a partition for the current month, score inserts fail, so this must
+    run well before each month starts (it is idempotent).
+
+    Returns:
+        Names of the partitions created.
+    """
+    today = today or datetime.now(timezone.utc).date()
+    existing = attached_partitions(conn)
+    created = []
+    for i in range(months_ahead + 1):
+        month = add_months(today, i)
+        if month in existing:
+            continue
+        name = partition_name(month)
+        conn.execute(
+            text(
+                f"CREATE TABLE {name} PARTITION OF {PARENT} "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') "
+                f"TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+            )
+        )
+        created.append(name)
+    return created
+
+
+def archive_partitions(conn: Connection, before: datetime, mode: ArchiveMode = "detach") -> list[str]:
+    """
+    Remove the partitions that only hold rows older than `before`.
+
+    - detach: the partition becomes a standalone table `scores_archive_YYYY_MM`
+      (dump it to cold storage, then drop it)
+    - drop: the partition and its rows are deleted
+
+    Both take a brief ACCESS EXCLUSIVE lock on `scores`; `lock_timeout` makes
+    the job give up rather than queue score writes behind it. The idempotency
+    keys of the removed rows are deleted first.
+
+    Returns:
+        Names of the partitions removed.
+    """
+    cutoff = month_start(before.astimezone(timezone.utc).date())
+    removed = []
+    for month, name in sorted(attached_partitions(conn).items()):
+        if add_months(month, 1) > cutoff:
+            continue
+        conn.execute(
+            text(f"DELETE FROM score_idempotency_keys k WHERE EXISTS (SELECT 1 FROM {name} s WHERE s.id = k.score_id)")
+        )
+        conn.execute(text("SET LOCAL lock_timeout = '5s'"))
+        conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        if mode == "drop":
+            conn.execute(text(f"DROP TABLE {name}"))
+        else:
+            conn.execute(text(f"ALTER TABLE {name} RENAME TO {PARENT}_archive_{month:%Y_%m}"))
+        removed.append(name)
+    return removed
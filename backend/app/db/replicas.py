@@ -0,0 +1,227 @@
+"""
+Read replica routing.
+
+DATABASE_REPLICA_URLS lists read replicas of the primary (DATABASE_URL).
+Read-only endpoints open their session through `replica_router`, which picks
+a healthy replica round-robin and falls back to the primary when:
+- no replica is configured, or none passed its last health check;
+- the read's consistency key (e.g. ("project", 42)) was written by this
+  process in the last DATABASE_REPLICA_READ_YOUR_WRITES_SECONDS, so a client
+  reading right after its own write sees it (read-your-writes).
+
+A background task checks every replica each DATABASE_REPLICA_HEALTH_CHECK_SECONDS:
+it must answer, and (PostgreSQL) replay the primary's WAL at most
+DATABASE_REPLICA_MAX_LAG_SECONDS behind. A replica whose connection fails
+during a request (that request fails) leaves the rotation at once, until it
+passes a check again.
+
+Writes, background jobs and streams always use the primary (app.db.session).
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Hashable
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.db.instrumentation import instrument_engine
+from app.db.session import SessionLocal, async_session, async_url, engine_options
+from app.services.cache import MISSING, TTLCache
+from app.services.metrics import Gauge, registry
+
+logger = logging.getLogger(__name__)
+
+# Seconds of replay lag behind the primary. 0 once everything received is
+# replayed (an idle primary must not make its replicas look late; after a
+# restart, replay starts ahead of streaming), and on a server that is not a
+# standby. NULL when the server does not stream WAL.
+_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() <= pg_last_wal_replay_lsn() THEN 0"
+    " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())"
+    " END"
+)
+
+# Consistency keys remembered for read-your-writes (oldest dropped first).
+RECENT_WRITES_MAX_KEYS = 100000
+
+
+class Replica:
+    """
+    One read replica: its sync engine, its async engine (created on first
+    use, like the primary's) and the result of its last health check.
+    """
+
+    def __init__(self, name: str, url: str) -> None:
+        self.name = name
+        self.url = url
+        self.engine = create_engine(url, **engine_options(url, name, QueuePool))
+        self._watch(self.engine)
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self._async_engine: AsyncEngine | None = None
+        self._async_session_factory: async_sessionmaker[AsyncSession] | None = None
+        # Out of rotation until the first health check passes.
+        self.healthy = False
+        self.lag: float | None = None
+        self.checked_at: float | None = None
+
+    def async_session(self) -> AsyncSession:
+        if self._async_session_factory is None:
+            url = async_url(self.url)
+            name = f"{self.name}-async"
+            self._async_engine = create_async_engine(url, **engine_options(url, name, AsyncAdaptedQueuePool))
+            self._watch(self._async_engine.sync_engine, name)
+            self._async_session_factory = async_sessionmaker(self._async_engine, autoflush=False, expire_on_commit=False)
+        return self._async_session_factory()
+
+    def check(self, max_lag: float) -> None:
+        """Run a health check (blocking) and update `healthy` / `lag`."""
+        try:
+            with self.engine.connect() as conn:
+                lag = conn.execute(_LAG_SQL if conn.dialect.name == "postgresql" else text("SELECT 0")).scalar()
+        except Exception as e:
+            self.lag = None
+            self._set_healthy(False, f"health check failed: {e.__class__.__name__}: {e}")
+        else:
+            self.lag = None if lag is None else float(lag)
+            if self.lag is None:
+                self._set_healthy(False, "not streaming from the primary")
+            elif self.lag > max_lag:
+                self._set_healthy(False, f"{self.lag:.1f} s behind the primary")
+            else:
+                self._set_healthy(True, "passed its health check")
+        self.checked_at = time.monotonic()
+
+    async def dispose(self) -> None:
+        self.engine.dispose()
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+            self._async_engine = None
+            self._async_session_factory = None
+
+    def _set_healthy(self, healthy: bool, reason: str) -> None:
+        if healthy != self.healthy:
+            log = logger.info if healthy else logger.warning
+            log("Read replica %s %s: %s rotation", self.name, reason, "back in" if healthy else "out of")
+        self.healthy = healthy
+
+    def _watch(self, engine: Engine, name: str | None = None) -> None:
+        """Instrument `engine` and take the replica out of rotation when it drops connections."""
+        instrument_engine(engine, name or self.name)
+
+        @event.listens_for(engine, "handle_error")
+        def _on_error(context) -> None:
+            # No connection: connecting failed (replica down or unreachable).
+            if context.is_disconnect or context.connection is None:
+                self._set_healthy(False, "connection failed")
+
+
+class ReplicaRouter:
+    """
+    Chooses the database of read-only sessions (see the module docstring).
+
+    `mark_write(key)` must be called after committing a write that reads
+    keyed by `key` should see; `session(key)` / `async_session(key)` then open
+    a primary session for that key during the read-your-writes window.
+    """
+
+    def __init__(self, urls: list[str], check_interval: float, max_lag: float, read_your_writes: float) -> None:
+        self.replicas = [Replica(f"replica{i}", url) for i, url in enumerate(urls)]
+        self.check_interval = check_interval
+        self.max_lag = max_lag
+        self._recent_writes = TTLCache(maxsize=RECENT_WRITES_MAX_KEYS, ttl=read_your_writes)
+        self._turn = itertools.count()
+        self._task: asyncio.Task | None = None
+
+    def mark_write(self, key: Hashable) -> None:
+        """Route reads of `key` to the primary for the read-your-writes window."""
+        if self.replicas:
+            self._recent_writes.set(key, True)
+
+    def pick(self, key: Hashable | None = None) -> Replica | None:
+        """The next healthy replica (round-robin), or None for the primary."""
+        if not self.replicas or (key is not None and self._recent_writes.get(key) is not MISSING):
+            return None
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    def session(self, key: Hashable | None = None) -> Session:
+        """New read-only Session on a replica, or on the primary (see `pick()`)."""
+        replica = self.pick(key)
+        return replica.session_factory() if replica else SessionLocal()
+
+    def async_session(self, key: Hashable | None = None) -> AsyncSession:
+        """New read-only AsyncSession on a replica, or on the primary (see `pick()`)."""
+        replica = self.pick(key)
+        return replica.async_session() if replica else async_session()
+
+    def status(self) -> dict[str, dict]:
+        """Health of each replica, for /health/db."""
+        now = time.monotonic()
+        return {
+            r.name: {
+                "healthy": r.healthy,
+                "lag_seconds": r.lag,
+                "checked_seconds_ago": None if r.checked_at is None else round(now - r.checked_at, 1),
+            }
+            for r in self.replicas
+        }
+
+    async def start(self) -> None:
+        """Check every replica, then keep checking them in the background (application startup)."""
+        if self.replicas and self._task is None:
+            await self._check_all()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the health checks and close the replica connection pools."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for replica in self.replicas:
+            await replica.dispose()
+            replica.healthy = False
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self._check_all()
+
+    async def _check_all(self) -> None:
+        # In worker threads (blocking drivers), all replicas at once: an
+        # unreachable one does not delay the checks of the others.
+        await asyncio.gather(*(asyncio.to_thread(r.check, self.max_lag) for r in self.replicas))
+
+
+replica_router = ReplicaRouter(
+    urls=[url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    check_interval=settings.DATABASE_REPLICA_HEALTH_CHECK_SECONDS,
+    max_lag=settings.DATABASE_REPLICA_MAX_LAG_SECONDS,
+    read_your_writes=settings.DATABASE_REPLICA_READ_YOUR_WRITES_SECONDS,
+)
+
+registry.register(
+    Gauge(
+        "scoreforge_db_replica_healthy",
+        "1 while the read replica is in rotation.",
+        lambda: {(r.name,): int(r.healthy) for r in replica_router.replicas},
+        ("replica",),
+    )
+)
+registry.register(
+    Gauge(
+        "scoreforge_db_replica_lag_seconds",
+        "Replay lag behind the primary at the last health check.",
+        lambda: {(r.name,): r.lag for r in replica_router.replicas if r.lag is not None},
+        ("replica",),
+    )
+)
@@ -1,16 +1,167 @@
+import time
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
 
 from app.core.config import settings
+from app.db.instrumentation import instrument_engine
+from app.services.metrics import Gauge, Histogram, registry
+
+POOL_CHECKOUT_WAIT = registry.register(
+    Histogram(
+        "scoreforge_db_pool_checkout_wait_seconds",
+        "Time spent waiting for a pooled DB connection (includes connecting).",
+        labelnames=("engine",),
+    )
+)
+
+# engine name ("sync", "async", "replica0", ...) -> live pool, for the gauges below
+_pools: dict[str, Pool] = {}
+
+
+def _instrumented(pool_cls: type[Pool], name: str) -> type[Pool]:
+    """
+    Subclass a pool class so every checkout records its wait time.
+
+    Pool.connect() is what engines call to obtain a connection; timing it
+    captures queueing behind a saturated pool as well as new connections.
+    A subclass (rather than an event) survives pool re-creation on dispose().
+    """
+
+    def connect(self):
+        _pools[name] = self
+        start = time.perf_counter()
+        try:
+            return pool_cls.connect(self)
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start, engine=name)
+
+    return type(f"Instrumented{pool_cls.__name__}", (pool_cls,), {"connect": connect})
+
 
-# Engine:
-# - pool_pre_ping=True helps detect stale connections (useful with cloud DBs)
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
+def engine_options(url: str, name: str, queue_pool: type[Pool]) -> dict:
+    """
+    Build create_engine()/create_async_engine() options from Settings.
+
+    SQLite (local dev) keeps SQLAlchemy's default pool and options.
+    """
+    parsed = make_url(url)
+    options: dict = {"pool_pre_ping": settings.DB_POOL_PRE_PING, "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS}
+    if parsed.get_backend_name() == "sqlite":
+        return options
+
+    if settings.DB_USE_NULL_POOL:
+        options["poolclass"] = _instrumented(NullPool, name)
+    else:
+        options["poolclass"] = _instrumented(queue_pool, name)
+        options["pool_size"] = settings.DB_POOL_SIZE
+        options["max_overflow"] = settings.DB_MAX_OVERFLOW
+        options["pool_timeout"] = settings.DB_POOL_TIMEOUT_SECONDS
+
+    if parsed.get_backend_name() == "postgresql" and parsed.get_driver_name() == "psycopg":
+        threshold = None if settings.DB_PGBOUNCER_TRANSACTION_MODE else settings.DB_PREPARE_THRESHOLD
+        options["connect_args"] = {"prepare_threshold": threshold}
+    return options
+
+
+def pool_stats() -> dict[str, dict]:
+    """
+    Current pool usage per engine, for health checks and pool sizing.
+
+    saturation = checked-out connections / (pool_size + max_overflow).
+    A saturation close to 1 together with a growing checkout wait means the
+    pool (or the DB connection budget) is too small for the worker's load.
+    """
+    stats = {}
+    for name, pool in list(_pools.items()):
+        item: dict = {"pool": type(pool).__name__, "checkout_wait_seconds": POOL_CHECKOUT_WAIT.summary(engine=name)}
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + max(settings.DB_MAX_OVERFLOW, 0)
+            item.update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                capacity=capacity,
+                saturation=round(pool.checkedout() / capacity, 3) if capacity else None,
+            )
+        stats[name] = item
+    return stats
+
+
+def _gauge(field: str):
+    return lambda: {(name,): s[field] for name, s in pool_stats().items() if s.get(field) is not None}
+
+
+registry.register(
+    Gauge("scoreforge_db_pool_checked_out", "Connections currently checked out.", _gauge("checked_out"), ("engine",))
+)
+registry.register(
+    Gauge("scoreforge_db_pool_saturation", "Checked-out connections / pool capacity.", _gauge("saturation"), ("engine",))
+)
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, "sync", QueuePool))
+instrument_engine(engine, "sync")
 
 # Session factory:
 # - autocommit=False and autoflush=False are standard defaults for explicit transactions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine / session factory (created on first use, see get_async_engine()).
+_async_engine: AsyncEngine | None = None
+_async_session_factory: async_sessionmaker[AsyncSession] | None = None
+
+# Sync driver -> asyncio driver used when ASYNC_DATABASE_URL is not set.
+# psycopg 3 ("postgresql+psycopg") serves both APIs with the same URL.
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg2": "postgresql+psycopg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def async_url(url: str) -> str:
+    """`url` with an asyncio-capable driver (unchanged if the driver is not known)."""
+    parsed = make_url(url)
+    driver = _ASYNC_DRIVERS.get(parsed.drivername)
+    return parsed.set(drivername=driver).render_as_string(hide_password=False) if driver else url
+
+
+def _async_database_url() -> str:
+    """ASYNC_DATABASE_URL if set, else DATABASE_URL with an asyncio-capable driver."""
+    return settings.ASYNC_DATABASE_URL or async_url(settings.DATABASE_URL)
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Return the process-wide AsyncEngine, creating it on first use.
+
+    Created lazily so that deployments which never hit an async route do not
+    need an asyncio driver installed (e.g. aiosqlite for local SQLite).
+    """
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        url = _async_database_url()
+        _async_engine = create_async_engine(url, **engine_options(url, "async", AsyncAdaptedQueuePool))
+        instrument_engine(_async_engine.sync_engine, "async")
+        # expire_on_commit=False: rows stay readable after commit without an
+        # implicit (and, in asyncio, forbidden) lazy refresh.
+        _async_session_factory = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+async def dispose_async_engine() -> None:
+    """Close the async connection pool (called on application shutdown)."""
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_factory = None
+
 
 def get_db():
     """
@@ -26,4 +177,29 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def async_session() -> AsyncSession:
+    """
+    New AsyncSession for work outside a request (background tasks).
+
+    Use it as `async with async_session() as db: ...`.
+    """
+    get_async_engine()
+    return _async_session_factory()
+
+
+async def get_async_db():
+    """
+    FastAPI dependency that provides a SQLAlchemy AsyncSession.
+
+    Usage:
+        async def endpoint(..., db: AsyncSession = Depends(get_async_db)):
+            ...
+
+    The session only checks out a connection when it first runs a statement,
+    so requests answered from in-memory caches never touch the pool.
+    """
+    async with async_session() as db:
+        yield db
@@ -1,13 +1,23 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.db.base import Base
-from app.db.session import engine
+from app.db.replicas import replica_router
+from app.db.session import dispose_async_engine, engine, pool_stats
 from app import models  # noqa: F401  (ensures model metadata is registered)
+from app.api.middleware import RequestMetricsMiddleware
 from app.api.routes.auth import router as auth_router
 from app.api.routes.projects import router as projects_router
 from app.api.routes.scores import router as scores_router
+from app.crud.projects import leaderboard_snapshot
+from app.services.ingest import score_ingest
+from app.services.leaderboard_snapshots import leaderboard_snapshots
+from app.services.leaderboard_stream import leaderboard_broadcaster
+from app.services.metrics import registry
+from app.services.password_hasher import password_hasher
+from app.services.rate_limit import rate_limiter
 
 
 def create_app() -> FastAPI:
@@ -20,8 +30,9 @@ def create_app() -> FastAPI:
     - Avoids surprises when running under reload/multiprocess
 
     Notes:
-    - DB schema creation is attached to the startup event for dev convenience.
-      In production you should use Alembic migrations instead.
+    - The schema is created and upgraded by Alembic migrations
+      (`alembic upgrade head`). DB_CREATE_TABLES_ON_STARTUP creates it at
+      startup instead, for throwaway dev databases only.
     """
     app = FastAPI(
         title="Scoreforge",
@@ -44,23 +55,106 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        # Let browser clients read leaderboard revalidation/pagination and rate limit headers.
+        expose_headers=["ETag", "X-Next-Cursor", "RateLimit-Limit", "RateLimit-Remaining", "RateLimit-Reset"],
     )
 
+    # Outermost middleware: times the whole request, CORS included.
+    if settings.METRICS_ENABLED:
+        app.add_middleware(
+            RequestMetricsMiddleware,
+            slow_request_seconds=settings.SLOW_REQUEST_LOG_SECONDS,
+            max_statements=settings.SLOW_REQUEST_LOG_MAX_STATEMENTS,
+        )
+
     @app.get("/health", tags=["health"], summary="Health check")
     def health() -> dict:
         """Lightweight health endpoint used for uptime checks and deployments."""
         return {"status": "ok"}
 
+    @app.get("/health/db", tags=["health"], summary="DB connection pool usage")
+    def health_db() -> dict:
+        """
+        Connection pool usage for this worker (size, checked out, saturation,
+        checkout wait percentiles). Use it to size DB_POOL_SIZE / DB_MAX_OVERFLOW.
+        Read replicas, if any, are listed with their last health check.
+        """
+        return {"status": "ok", "pools": pool_stats(), "replicas": replica_router.status()}
+
+    if settings.METRICS_ENABLED:
+
+        @app.get("/metrics", tags=["health"], summary="Prometheus metrics", response_class=PlainTextResponse)
+        def metrics() -> PlainTextResponse:
+            """
+            This worker's metrics in the Prometheus text format: request latency
+            and SQL usage per route, SQL statement latency, pool usage.
+            """
+            return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
     @app.on_event("startup")
     def _startup_create_tables() -> None:
         """
-        DEV convenience: auto-create DB tables.
+        DEV convenience: auto-create DB tables when DB_CREATE_TABLES_ON_STARTUP.
 
         Important:
-        - This should be removed/disabled in production.
+        - Tables created this way are not known to Alembic: a database
+          created by it cannot be upgraded with `alembic upgrade head`.
         - Use Alembic migrations for controlled schema evolution.
         """
-        Base.metadata.create_all(bind=engine)
+        if settings.DB_CREATE_TABLES_ON_STARTUP:
+            Base.metadata.create_all(bind=engine)
+
+    @app.on_event("startup")
+    def _startup_score_ingest() -> None:
+        """Start the write-behind score writer when SCORE_INGEST_MODE=queued."""
+        if settings.SCORE_INGEST_MODE == "queued":
+            score_ingest.start()
+
+    @app.on_event("startup")
+    async def _startup_leaderboard_snapshots() -> None:
+        """Start the leaderboard snapshot refresher when LEADERBOARD_SNAPSHOTS_ENABLED."""
+        if settings.LEADERBOARD_SNAPSHOTS_ENABLED:
+            leaderboard_snapshots.start(leaderboard_snapshot)
+
+    @app.on_event("startup")
+    async def _startup_leaderboard_streams() -> None:
+        """End open leaderboard streams when the server is told to exit (see stop_on_exit_signals)."""
+        leaderboard_broadcaster.stop_on_exit_signals()
+
+    @app.on_event("startup")
+    async def _startup_replica_router() -> None:
+        """Run the first read replica health checks, then keep checking in the background."""
+        await replica_router.start()
+
+    @app.on_event("shutdown")
+    def _shutdown_score_ingest() -> None:
+        """Flush queued scores before the process exits."""
+        score_ingest.stop()
+
+    @app.on_event("shutdown")
+    def _shutdown_password_hasher() -> None:
+        """Stop the password hashing processes."""
+        password_hasher.shutdown()
+
+    @app.on_event("shutdown")
+    async def _shutdown_leaderboard_snapshots() -> None:
+        """Stop refreshing leaderboard snapshots."""
+        await leaderboard_snapshots.stop()
+
+    @app.on_event("shutdown")
+    async def _shutdown_rate_limiter() -> None:
+        """Close the shared rate limit backend connection, if any."""
+        await rate_limiter.close()
+
+    @app.on_event("shutdown")
+    async def _shutdown_replica_router() -> None:
+        """Stop the replica health checks and close their pools."""
+        await replica_router.stop()
+
+    @app.on_event("shutdown")
+    async def _shutdown_async_engine() -> None:
+        """Close pooled async connections."""
+        await dispose_async_engine()
 
     # Routers
     app.include_router(auth_router)
@@ -0,0 +1,94 @@
+"""
+Scheduled maintenance tasks.
+
+Run from `backend/` (e.g. from cron or a platform scheduler):
+
+    python -m app.maintenance prune-periods
+    python -m app.maintenance maintain-scores
+    python -m app.maintenance prune-idempotency-keys
+"""
+
+import argparse
+import logging
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.crud.projects import (
+    prune_expired_scores,
+    prune_idempotency_keys,
+    prune_period_scores,
+    scores_expired_before,
+)
+from app.db import partitions
+from app.db.session import SessionLocal, engine
+
+logger = logging.getLogger("app.maintenance")
+
+
+def prune_periods() -> None:
+    """Delete expired daily/weekly leaderboard buckets."""
+    db = SessionLocal()
+    try:
+        deleted = prune_period_scores(db)
+    finally:
+        db.close()
+    for period, count in deleted.items():
+        logger.info("Pruned %d %s bucket rows", count, period)
+
+
+def maintain_scores() -> None:
+    """
+    Apply score retention.
+
+    1. PostgreSQL partitions: create the next SCORES_PARTITIONS_AHEAD_MONTHS
+       months, then detach (or drop) the months expired for every project.
+    2. Delete the remaining expired rows project by project.
+    """
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        if partitions.is_partitioned(conn):
+            for name in partitions.ensure_partitions(conn, settings.SCORES_PARTITIONS_AHEAD_MONTHS, now.date()):
+                logger.info("Created partition %s", name)
+
+    db = SessionLocal()
+    try:
+        cutoff = scores_expired_before(db, now)
+        db.rollback()
+        if cutoff is not None:
+            with engine.begin() as conn:
+                if partitions.is_partitioned(conn):
+                    for name in partitions.archive_partitions(conn, cutoff, settings.SCORES_ARCHIVE_MODE):
+                        logger.info("Archived partition %s (%s)", name, settings.SCORES_ARCHIVE_MODE)
+        deleted = prune_expired_scores(db, now)
+    finally:
+        db.close()
+    logger.info("Deleted %d expired scores", deleted)
+
+
+def prune_idempotency() -> None:
+    """Delete score idempotency keys past their retention."""
+    db = SessionLocal()
+    try:
+        deleted = prune_idempotency_keys(db, datetime.now(timezone.utc))
+    finally:
+        db.close()
+    logger.info("Pruned %d idempotency keys", deleted)
+
+
+COMMANDS = {
+    "prune-periods": prune_periods,
+    "maintain-scores": maintain_scores,
+    "prune-idempotency-keys": prune_idempotency,
+}
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.maintenance", description=__doc__.splitlines()[1])
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    COMMANDS[args.command]()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
 from app.models.user import User
-from app.models.project import Project, ApiKey, Score
+from app.models.project import Project, ApiKey, Score, BestScore, BestScoreBucket, PeriodBestScore, ScoreIdempotencyKey
 
-__all__ = ["User", "Project", "ApiKey", "Score"]
+__all__ = ["User", "Project", "ApiKey", "Score", "BestScore", "BestScoreBucket", "PeriodBestScore", "ScoreIdempotencyKey"]
@@ -1,4 +1,4 @@
-from sqlalchemy import String, ForeignKey, UniqueConstraint, DateTime, func
+from sqlalchemy import Date, String, ForeignKey, UniqueConstraint, DateTime, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
@@ -8,10 +8,24 @@ class Project(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(80), nullable=False)
     owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    # Days of score history kept (None = SCORES_RETENTION_DAYS).
+    score_retention_days: Mapped[int | None] = mapped_column(nullable=True)
+    # Score submission rate limit (None = RATE_LIMIT_SCORES_PER_MINUTE / RATE_LIMIT_BURST).
+    rate_limit_per_minute: Mapped[int | None] = mapped_column(nullable=True)
+    rate_limit_burst: Mapped[int | None] = mapped_column(nullable=True)
+    # Max age of leaderboard snapshots served for this project
+    # (None = LEADERBOARD_SNAPSHOT_MAX_AGE_SECONDS, 0 = always read live).
+    leaderboard_snapshot_max_age_seconds: Mapped[int | None] = mapped_column(nullable=True)
 
     owner = relationship("User", back_populates="projects")
     api_keys = relationship("ApiKey", back_populates="project", cascade="all, delete-orphan")
     scores = relationship("Score", back_populates="project", cascade="all, delete-orphan")
+    best_scores = relationship("BestScore", back_populates="project", cascade="all, delete-orphan")
+    best_score_buckets = relationship("BestScoreBucket", back_populates="project", cascade="all, delete-orphan")
+    period_best_scores = relationship("PeriodBestScore", back_populates="project", cascade="all, delete-orphan")
+    score_idempotency_keys = relationship(
+        "ScoreIdempotencyKey", back_populates="project", cascade="all, delete-orphan"
+    )
 
     __table_args__ = (UniqueConstraint("owner_id", "name", name="uq_owner_project_name"),)
 
@@ -29,6 +43,14 @@ class ApiKey(Base):
     project = relationship("Project", back_populates="api_keys")
 
 class Score(Base):
+    """
+    One submitted score.
+
+    On PostgreSQL, alembic revision 0006 partitions this table by month of
+    created_at (primary key (id, created_at), see app/db/partitions.py); `id`
+    stays unique since it comes from a single sequence.
+    """
+
     __tablename__ = "scores"
 
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -38,3 +60,136 @@ class Score(Base):
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     project = relationship("Project", back_populates="scores")
+
+# Leaderboard covering index (see alembic revision 0002).
+# Key order matches the leaderboard ORDER BY; INCLUDE (username) enables
+# index-only scans on PostgreSQL.
+Index(
+    "ix_scores_leaderboard",
+    Score.project_id,
+    Score.value.desc(),
+    Score.created_at.desc(),
+    Score.id.desc(),
+    postgresql_include=["username"],
+)
+
+class BestScore(Base):
+    """
+    Best score per player and project (materialized from `scores`).
+
+    Maintained by the score write path with an upsert-if-greater, so the
+    "best per player" leaderboard is a plain top-N over this table.
+    """
+
+    __tablename__ = "best_scores"
+
+    __table_args__ = (UniqueConstraint("project_id", "username", name="uq_best_scores_project_username"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
+    username: Mapped[str] = mapped_column(String(50), nullable=False)
+    value: Mapped[int] = mapped_column(nullable=False)
+    # scores.id of the submission that set this best (no FK: scores may be pruned)
+    score_id: Mapped[int] = mapped_column(nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Value replaced by the last raise (None until the first one): returned by
+    # the upsert so the write path knows which bucket the player left.
+    previous_value: Mapped[int | None] = mapped_column(nullable=True)
+
+    project = relationship("Project", back_populates="best_scores")
+
+# Same layout as ix_scores_leaderboard (see alembic revision 0003).
+Index(
+    "ix_best_scores_leaderboard",
+    BestScore.project_id,
+    BestScore.value.desc(),
+    BestScore.created_at.desc(),
+    BestScore.id.desc(),
+    postgresql_include=["username"],
+)
+
+class BestScoreBucket(Base):
+    """
+    Number of players per project whose best score falls in a value bucket.
+
+    Buckets are log-scaled value ranges (see `score_bucket()` in
+    app/crud/projects.py). Kept in step with `best_scores` by the score write
+    path, so a player's rank is the sum of the buckets above theirs plus a
+    count within their own bucket, instead of a count of every player above.
+    """
+
+    __tablename__ = "best_score_buckets"
+
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), primary_key=True)
+    bucket: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    players: Mapped[int] = mapped_column(nullable=False)
+
+    project = relationship("Project", back_populates="best_score_buckets")
+
+class PeriodBestScore(Base):
+    """
+    Best score per player, project and time bucket (daily / weekly boards).
+
+    `period_start` is the first day of the bucket in UTC (the day itself, or the
+    Monday of the ISO week). Maintained by the score write path like
+    `best_scores`; expired buckets are deleted by `python -m app.maintenance`.
+    """
+
+    __tablename__ = "period_best_scores"
+
+    __table_args__ = (
+        UniqueConstraint(
+            "project_id", "period", "period_start", "username", name="uq_period_best_scores_bucket_username"
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
+    period: Mapped[str] = mapped_column(String(10), nullable=False)  # "daily" | "weekly"
+    period_start: Mapped[Date] = mapped_column(Date, nullable=False)
+    username: Mapped[str] = mapped_column(String(50), nullable=False)
+    value: Mapped[int] = mapped_column(nullable=False)
+    score_id: Mapped[int] = mapped_column(nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    project = relationship("Project", back_populates="period_best_scores")
+
+# Leaderboard covering index of one bucket (see alembic revision 0005): the
+# equality prefix pins the bucket, the rest matches the leaderboard ORDER BY.
+Index(
+    "ix_period_best_scores_leaderboard",
+    PeriodBestScore.project_id,
+    PeriodBestScore.period,
+    PeriodBestScore.period_start,
+    PeriodBestScore.value.desc(),
+    PeriodBestScore.created_at.desc(),
+    PeriodBestScore.id.desc(),
+    postgresql_include=["username"],
+)
+
+# Lets the retention job find expired buckets across projects.
+Index("ix_period_best_scores_expiry", PeriodBestScore.period, PeriodBestScore.period_start)
+
+class ScoreIdempotencyKey(Base):
+    """
+    Idempotency key of a score submission, claimed in the score's transaction.
+
+    A retry carrying the same key (per project) is answered with `score_id`
+    instead of inserting the score again. Kept for IDEMPOTENCY_KEY_RETENTION_HOURS,
+    then deleted by `python -m app.maintenance prune-idempotency-keys`.
+    """
+
+    __tablename__ = "score_idempotency_keys"
+
+    __table_args__ = (UniqueConstraint("project_id", "key", name="uq_score_idempotency_keys_project_key"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), nullable=False)
+    key: Mapped[str] = mapped_column(String(128), nullable=False)
+    # scores.id of the first submission (no FK: scores is partitioned on PostgreSQL)
+    score_id: Mapped[int] = mapped_column(nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True, nullable=False
+    )
+
+    project = relationship("Project", back_populates="score_idempotency_keys")
@@ -9,5 +9,7 @@ class User(Base):
     username: Mapped[str] = mapped_column(String(50), unique=True, index=True, nullable=False)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Embedded in JWTs ("tv" claim); bumping it revokes every token issued before.
+    token_version: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
 
     projects = relationship("Project", back_populates="owner", cascade="all, delete-orphan")
@@ -1,5 +1,10 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+# Formats of GET /projects/{project_id}/export.
+ExportFormat = Literal["ndjson", "csv"]
+
 
 class ProjectCreate(BaseModel):
     """
@@ -17,6 +22,44 @@ class ProjectCreate(BaseModel):
     )
 
 
+class ProjectUpdate(BaseModel):
+    """
+    Partial update of a project (PATCH): only the fields sent are changed.
+    """
+
+    score_retention_days: int | None = Field(
+        default=None,
+        ge=1,
+        le=3650,
+        description="Days of score history to keep (null = server default).",
+        examples=[90],
+    )
+    rate_limit_per_minute: int | None = Field(
+        default=None,
+        ge=1,
+        le=1_000_000,
+        description="Scores accepted per minute, sustained (null = server default).",
+        examples=[1200],
+    )
+    rate_limit_burst: int | None = Field(
+        default=None,
+        ge=1,
+        le=100_000,
+        description="Scores accepted in a burst above the sustained rate (null = server default).",
+        examples=[200],
+    )
+    leaderboard_snapshot_max_age_seconds: int | None = Field(
+        default=None,
+        ge=0,
+        le=3600,
+        description=(
+            "Max age of the leaderboard snapshots served for this project, when the server"
+            " enables them (0 = always read live, null = server default)."
+        ),
+        examples=[10],
+    )
+
+
 class ProjectOut(BaseModel):
     """
     Public representation of a project returned by the API.
@@ -26,6 +69,18 @@ class ProjectOut(BaseModel):
 
     id: int = Field(description="Project unique identifier.")
     name: str = Field(description="Project name.")
+    score_retention_days: int | None = Field(
+        default=None, description="Days of score history kept (null = server default)."
+    )
+    rate_limit_per_minute: int | None = Field(
+        default=None, description="Sustained score submission rate per minute (null = server default)."
+    )
+    rate_limit_burst: int | None = Field(
+        default=None, description="Score submission burst size (null = server default)."
+    )
+    leaderboard_snapshot_max_age_seconds: int | None = Field(
+        default=None, description="Leaderboard snapshot staleness bound in seconds (null = server default)."
+    )
 
     class Config:
         from_attributes = True
@@ -1,9 +1,63 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
+# Leaderboard modes:
+# - all: every submitted score is ranked (a player can appear several times)
+# - best: one row per player (their best score)
+# - daily / weekly: one row per player, best score of the current UTC day /
+#   ISO week (Monday to Sunday)
+LeaderboardMode = Literal["all", "best", "daily", "weekly"]
+
+# Max length of an idempotency key (Idempotency-Key header or body field).
+MAX_IDEMPOTENCY_KEY_LENGTH = 128
+
 class ScoreSubmit(BaseModel):
     username: str = Field(min_length=3, max_length=50)
     value: int = Field(ge=0)
+    idempotency_key: str | None = Field(
+        default=None,
+        min_length=1,
+        max_length=MAX_IDEMPOTENCY_KEY_LENGTH,
+        description=(
+            "Client-generated unique key (e.g. a UUID) reused on retries: a retry "
+            "returns the id of the first submission instead of storing the score again."
+        ),
+    )
+
+# Max scores accepted by POST /scores/submit/batch.
+MAX_BATCH_SIZE = 500
+
+class ScoreBatchSubmit(BaseModel):
+    scores: list[ScoreSubmit] = Field(
+        min_length=1,
+        max_length=MAX_BATCH_SIZE,
+        description=f"Scores to submit (1-{MAX_BATCH_SIZE}), stored in this order.",
+    )
+
+class ScoreBatchItemOut(BaseModel):
+    index: int = Field(description="Position of the item in the submitted list.")
+    id: int = Field(description="ID of the stored score.")
+
+class ScoreBatchOut(BaseModel):
+    ok: bool = True
+    accepted: int
+    results: list[ScoreBatchItemOut]
+
+# Max page size of GET /scores/leaderboard (deeper rows are read with cursors).
+MAX_LEADERBOARD_PAGE_SIZE = 100
 
 class ScoreOut(BaseModel):
     username: str
     value: int
+
+class RankedScoreOut(BaseModel):
+    rank: int
+    username: str
+    value: int
+
+class PlayerRankOut(BaseModel):
+    username: str
+    rank: int = Field(description="1-based position on the best-per-player leaderboard.")
+    value: int = Field(description="Player's best score.")
+    neighbors: list[RankedScoreOut] = Field(description="Players around this one, including the player.")
@@ -0,0 +1,45 @@
+import base64
+import json
+from datetime import datetime
+
+from app.services.leaderboard_index import RankedEntry
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(board: str, entry: RankedEntry) -> str:
+    """
+    Opaque keyset cursor pointing just after `entry` on `board`.
+
+    Holds the full sort key (value, created_at, id), so the next page is a
+    range scan starting at that key, whatever the depth. Cursors are not
+    signed: a forged one only selects a different starting point.
+    """
+    raw = json.dumps(
+        [board, entry.value, entry.created_at.isoformat(), entry.id, entry.username],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[str, RankedEntry]:
+    """
+    Decode a cursor built by `encode_cursor()`.
+
+    Returns:
+        (board name, last entry of the previous page)
+
+    Raises:
+        InvalidCursor: if the token is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        board, value, created_at, id_, username = json.loads(raw)
+        entry = RankedEntry(
+            id=int(id_), username=str(username), value=int(value), created_at=datetime.fromisoformat(created_at)
+        )
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+    return str(board), entry
@@ -0,0 +1,178 @@
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from app.core.config import settings
+from app.crud.projects import insert_scores, scores_committed
+from app.db.session import SessionLocal
+from app.schemas.scores import ScoreSubmit
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueueFull(Exception):
+    """Raised when the ingestion queue cannot accept more scores (backpressure)."""
+
+
+class ScoreIngestQueue:
+    """
+    Write-behind queue for score submissions (group commit).
+
+    Request path:
+    - `submit()` puts the validated score on a bounded in-process queue and
+      returns immediately; if the queue is full it raises IngestQueueFull.
+
+    Worker thread:
+    - Waits for the first score, then keeps collecting until it has
+      `batch_size` scores or `flush_interval` seconds have passed.
+    - Writes the whole batch (all projects) in ONE transaction: one multi-row
+      insert per project, one COMMIT, so fsync cost is shared by the batch.
+    - If that transaction fails, each project is retried in its own
+      transaction, a few times: only the scores of a project that keeps
+      failing (e.g. deleted while its scores were queued) are logged and
+      dropped, not those of the other projects in the batch.
+
+    Shutdown:
+    - `stop()` stops accepting scores and blocks until the queue is drained.
+
+    Durability trade-off:
+    - Clients get 202 before the score is committed. Scores still in memory are
+      lost if the process is killed without a clean shutdown.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, maxsize: int, batch_size: int, flush_interval: float, session_factory=SessionLocal) -> None:
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._session_factory = session_factory
+        self._queue: queue.Queue[tuple[int, ScoreSubmit]] = queue.Queue(maxsize=maxsize)
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the background writer (idempotent)."""
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="score-ingest", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 30.0) -> None:
+        """Stop accepting scores, flush everything still queued, then join the worker."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.error("Score ingest worker did not drain within %ss (%d scores pending)", timeout, self.pending)
+        self._thread = None
+
+    @property
+    def pending(self) -> int:
+        """Approximate number of queued scores."""
+        return self._queue.qsize()
+
+    def submit(self, project_id: int, score_in: ScoreSubmit) -> None:
+        """
+        Enqueue a score for asynchronous persistence.
+
+        Raises:
+            IngestQueueFull: the queue is full or the worker is shutting down.
+        """
+        if self._stopping.is_set() or not self.running:
+            raise IngestQueueFull("Score ingestion is not accepting writes")
+        try:
+            self._queue.put_nowait((project_id, score_in))
+        except queue.Full:
+            raise IngestQueueFull("Score ingestion queue is full")
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+            elif self._stopping.is_set():
+                return
+
+    def _collect(self) -> list[tuple[int, ScoreSubmit]]:
+        """Block for the first item, then gather more until size or time window is reached."""
+        try:
+            first = self._queue.get(timeout=0.1 if self._stopping.is_set() else self.flush_interval * 4)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    # Window elapsed: still take whatever is already queued.
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: list[tuple[int, ScoreSubmit]]) -> None:
+        by_project: dict[int, list[ScoreSubmit]] = defaultdict(list)
+        for project_id, score_in in batch:
+            by_project[project_id].append(score_in)
+
+        try:
+            self._write(by_project)
+            return
+        except Exception:
+            logger.warning("Score ingest flush failed, retrying project by project", exc_info=True)
+
+        for project_id, items in by_project.items():
+            for attempt in range(1, self.MAX_ATTEMPTS + 1):
+                try:
+                    self._write({project_id: items})
+                    break
+                except Exception:
+                    if attempt == self.MAX_ATTEMPTS:
+                        logger.exception(
+                            "Dropping %d queued scores of project %d after %d failed attempts",
+                            len(items),
+                            project_id,
+                            attempt,
+                        )
+                        break
+                    logger.warning(
+                        "Score ingest flush failed for project %d (attempt %d), retrying",
+                        project_id,
+                        attempt,
+                        exc_info=True,
+                    )
+                    time.sleep(0.2 * attempt)
+
+    def _write(self, by_project: dict[int, list[ScoreSubmit]]) -> None:
+        """Insert the scores of these projects in one transaction, then update the caches."""
+        db = self._session_factory()
+        try:
+            written = [(pid, insert_scores(db, pid, items)) for pid, items in by_project.items()]
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        for pid, write in written:
+            scores_committed(pid, write)
+
+
+score_ingest = ScoreIngestQueue(
+    maxsize=settings.SCORE_INGEST_QUEUE_SIZE,
+    batch_size=settings.SCORE_INGEST_BATCH_SIZE,
+    flush_interval=settings.SCORE_INGEST_FLUSH_SECONDS,
+)
@@ -0,0 +1,260 @@
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Callable, Iterable, NamedTuple
+
+from app.core.config import settings
+
+
+class RankedEntry(NamedTuple):
+    """
+    Lightweight leaderboard row kept in memory.
+
+    Exposes the same attributes the routes read from a `Score` row
+    (`username`, `value`), plus the fields needed to order ties.
+    """
+
+    id: int
+    username: str
+    value: int
+    created_at: datetime
+
+
+def sort_key(entry: RankedEntry) -> tuple[int, int, int]:
+    """
+    Ascending sort key matching the SQL ordering:
+    value DESC, created_at DESC, id DESC.
+
+    created_at is converted to integer microseconds so ties compare exactly.
+    """
+    ts = entry.created_at
+    micros = int(ts.timestamp()) * 1_000_000 + ts.microsecond
+    return (-entry.value, -micros, -entry.id)
+
+
+class _Board:
+    """
+    Sorted top-K array for a single leaderboard.
+
+    Keys and entries are kept in two parallel lists so `bisect` can work on the
+    keys directly. A sorted array is the simplest order-statistic structure:
+    the position of an entry is its rank.
+
+    Boards are either:
+    - raw (one entry per score row, identified by id), or
+    - unique (one entry per player, identified by username; a new entry only
+      replaces the current one if it ranks higher).
+    """
+
+    __slots__ = ("keys", "entries", "members", "unique", "ready", "pending", "warmed_at")
+
+    def __init__(self, unique: bool = False) -> None:
+        self.keys: list[tuple[int, int, int]] = []
+        self.entries: list[RankedEntry] = []
+        # identity (id or username) -> current sort key
+        self.members: dict[int | str, tuple[int, int, int]] = {}
+        self.unique = unique
+        self.ready = False
+        # Entries written while the board was being warmed from the DB.
+        self.pending: list[RankedEntry] = []
+        # time.monotonic() when the warm-up query started.
+        self.warmed_at = time.monotonic()
+
+    def insert(self, entry: RankedEntry, capacity: int) -> None:
+        identity = entry.username if self.unique else entry.id
+        key = sort_key(entry)
+        current = self.members.get(identity)
+        if current is not None:
+            if not self.unique or key >= current:
+                return
+            self._remove(identity, current)
+        if len(self.keys) >= capacity and key >= self.keys[-1]:
+            # Below the cut-off of a full board: cannot be part of the top-K.
+            return
+        pos = bisect_left(self.keys, key)
+        self.keys.insert(pos, key)
+        self.entries.insert(pos, entry)
+        self.members[identity] = key
+        if len(self.keys) > capacity:
+            self.keys.pop()
+            dropped = self.entries.pop()
+            del self.members[dropped.username if self.unique else dropped.id]
+
+    def _remove(self, identity: int | str, key: tuple[int, int, int]) -> None:
+        pos = bisect_left(self.keys, key)
+        del self.keys[pos]
+        del self.entries[pos]
+        del self.members[identity]
+
+
+BoardKey = tuple[int, str]
+"""(project_id, board name): the mode, plus the bucket for windowed modes"""
+
+
+class LeaderboardIndex:
+    """
+    In-process ranked index of the best `capacity` entries per leaderboard.
+
+    Each (project_id, board name) pair has its own board.
+
+    Lifecycle of a board:
+    - absent: nothing cached; reads go to the DB and start a warm-up
+    - warming: one reader is loading the top-K from the DB; writes are buffered
+    - ready: reads are served from memory; writes are merged in place
+
+    Correctness notes:
+    - Only the top-K is kept. The top-K of (set + new entry) is always contained
+      in (old top-K + new entry), so dropping rows below the cut-off is safe.
+    - The DB query is never run while holding the lock, so the same index can be
+      driven from sync routes (threadpool) and async routes (event loop).
+    - The index is process-local: with several workers, each one only sees its
+      own writes. That is why it is opt-in (LEADERBOARD_INDEX_ENABLED).
+    - Rows deleted elsewhere (score retention runs in the maintenance process)
+      never reach it either: boards older than `max_age` seconds are dropped
+      by `expire()` and warmed again from the DB.
+    """
+
+    def __init__(self, capacity: int, enabled: bool = True, max_age: float | None = None) -> None:
+        self.capacity = capacity
+        self.enabled = enabled
+        self.max_age = max_age
+        self._boards: dict[BoardKey, _Board] = {}
+        self._lock = threading.Lock()
+
+    def can_serve(self, limit: int) -> bool:
+        """Return True if a top-`limit` read may be answered from memory."""
+        return self.enabled and 0 < limit <= self.capacity
+
+    def top(self, board_key: BoardKey, limit: int) -> list[RankedEntry] | None:
+        """Return the top `limit` entries, or None if the board is not ready."""
+        with self._lock:
+            board = self._boards.get(board_key)
+            if board is None or not board.ready:
+                return None
+            return board.entries[:limit]
+
+    def after(self, board_key: BoardKey, entry: RankedEntry, limit: int) -> list[RankedEntry] | None:
+        """
+        Return up to `limit` entries ranked strictly below `entry` (keyset page).
+
+        Returns None when memory cannot answer exactly: the board is not ready,
+        or the page runs past the cut-off of a full board.
+        """
+        with self._lock:
+            board = self._boards.get(board_key)
+            if board is None or not board.ready:
+                return None
+            pos = bisect_right(board.keys, sort_key(entry))
+            if pos + limit > len(board.keys) and len(board.keys) >= self.capacity:
+                return None
+            return board.entries[pos : pos + limit]
+
+    def around(self, board_key: BoardKey, username: str, radius: int) -> tuple[int, list[RankedEntry]] | None:
+        """
+        Return a player's neighborhood on a unique (one row per player) board.
+
+        Returns (rank of the first entry, entries) with up to `radius` entries on
+        each side of the player, or None when memory cannot answer exactly: the
+        board is not ready, the player is not on it, or the window runs past the
+        cut-off of a full board.
+        """
+        with self._lock:
+            board = self._boards.get(board_key)
+            if board is None or not board.ready or not board.unique:
+                return None
+            key = board.members.get(username)
+            if key is None:
+                return None
+            pos = bisect_left(board.keys, key)
+            if pos + radius >= len(board.keys) and len(board.keys) >= self.capacity:
+                return None
+            start = max(0, pos - radius)
+            return start + 1, board.entries[start : pos + radius + 1]
+
+    def begin_warm(self, board_key: BoardKey, unique: bool = False) -> bool:
+        """
+        Claim the warm-up of a board.
+
+        `unique` boards keep one entry per username (best score per player).
+
+        Returns True if the caller must load the top-K from the DB and then call
+        `finish_warm()` (or `abort_warm()` on failure). Returns False if the board
+        is already ready or another caller is warming it.
+        """
+        with self._lock:
+            if board_key in self._boards:
+                return False
+            self._boards[board_key] = _Board(unique=unique)
+            return True
+
+    def finish_warm(self, board_key: BoardKey, entries: Iterable[RankedEntry]) -> None:
+        """Populate a warming board with rows loaded from the DB."""
+        with self._lock:
+            board = self._boards.get(board_key)
+            if board is None or board.ready:
+                return
+            for entry in entries:
+                board.insert(entry, self.capacity)
+            for entry in board.pending:
+                board.insert(entry, self.capacity)
+            board.pending = []
+            board.ready = True
+
+    def abort_warm(self, board_key: BoardKey) -> None:
+        """Drop a board whose warm-up failed so the next reader retries."""
+        with self._lock:
+            board = self._boards.get(board_key)
+            if board is not None and not board.ready:
+                del self._boards[board_key]
+
+    def add(self, board_key: BoardKey, entries: Iterable[RankedEntry]) -> None:
+        """
+        Merge freshly committed entries into a board.
+
+        Must be called after the transaction commits. If the board does not
+        exist yet, nothing is done: the next warm-up will read the rows from DB.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            board = self._boards.get(board_key)
+            if board is None:
+                return
+            if not board.ready:
+                board.pending.extend(entries)
+                return
+            for entry in entries:
+                board.insert(entry, self.capacity)
+
+    def discard(self, predicate: Callable[[BoardKey], bool]) -> None:
+        """Forget the boards whose key matches `predicate` (e.g. expired buckets)."""
+        with self._lock:
+            for board_key in [k for k in self._boards if predicate(k)]:
+                del self._boards[board_key]
+
+    def expire(self, board_key: BoardKey) -> bool:
+        """
+        Drop a ready board warmed more than `max_age` seconds ago, so that the
+        next read warms it again. Returns True if the board was dropped.
+        """
+        if self.max_age is None:
+            return False
+        with self._lock:
+            board = self._boards.get(board_key)
+            if board is None or not board.ready or time.monotonic() - board.warmed_at <= self.max_age:
+                return False
+            del self._boards[board_key]
+            return True
+
+    def clear(self) -> None:
+        """Forget every board."""
+        with self._lock:
+            self._boards.clear()
+
+
+leaderboard_index = LeaderboardIndex(
+    capacity=settings.LEADERBOARD_INDEX_CAPACITY,
+    enabled=settings.LEADERBOARD_INDEX_ENABLED,
+    max_age=settings.LEADERBOARD_INDEX_MAX_AGE_SECONDS,
+)
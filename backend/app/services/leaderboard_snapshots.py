@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import threading
+import time
+from bisect import bisect_right
+from typing import Callable, NamedTuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.leaderboard_index import BoardKey, RankedEntry, sort_key
+
+logger = logging.getLogger(__name__)
+
+# (db, project_id, board, size) -> (staleness bound in seconds or None, top-`size` entries)
+SnapshotLoader = Callable[[Session, int, str, int], tuple[float | None, list[RankedEntry]]]
+
+
+class _Snapshot(NamedTuple):
+    keys: list[tuple[int, int, int]]
+    entries: list[RankedEntry]
+    # None: the project reads live (or is gone); entries are empty.
+    max_age: float | None
+    # time.monotonic() when the query started: the data is at least this fresh.
+    taken_at: float
+
+    def fresh(self, now: float) -> bool:
+        return self.max_age is not None and now - self.taken_at <= self.max_age
+
+
+class LeaderboardSnapshots:
+    """
+    Periodically refreshed top-K copies of the leaderboards being read.
+
+    - A read registers its board; while a board keeps being read, one task
+      re-runs its top-K query every `max_age / 2` seconds, whatever the write
+      volume. Boards not read for `idle` seconds are dropped.
+    - `get()` answers from a snapshot younger than the project's `max_age`,
+      and returns None (read the database) otherwise: a late or failing
+      refresh never stretches the staleness bound.
+    - The bound comes with each refresh (the loader reads the project's
+      setting), so public reads never look the project up. Projects that read
+      live are re-checked every `idle` seconds.
+
+    Unlike the leaderboard index, snapshots ignore writes: every worker keeps
+    its own copy, which sees the writes of all workers at the next refresh.
+    """
+
+    TICK = 0.25
+
+    def __init__(self, size: int, idle: float) -> None:
+        self.size = size
+        self.idle = idle
+        self._snapshots: dict[BoardKey, _Snapshot] = {}
+        self._last_read: dict[BoardKey, float] = {}
+        self._lock = threading.Lock()
+        self._loader: SnapshotLoader | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def get(self, board_key: BoardKey, limit: int, after: RankedEntry | None = None) -> list[RankedEntry] | None:
+        """
+        Return the top `limit` entries, or the page below `after`, from a fresh
+        enough snapshot; None when the caller must read the database.
+        """
+        if self._task is None or limit > self.size:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            self._last_read[board_key] = now
+            snapshot = self._snapshots.get(board_key)
+        if snapshot is None or not snapshot.fresh(now):
+            return None
+        if after is None:
+            return snapshot.entries[:limit]
+        pos = bisect_right(snapshot.keys, sort_key(after))
+        if pos + limit > len(snapshot.keys) and len(snapshot.keys) >= self.size:
+            return None  # runs past the cut-off of a full snapshot
+        return snapshot.entries[pos : pos + limit]
+
+    def generation(self, board_key: BoardKey) -> float | None:
+        """
+        Identify the snapshot `get()` currently answers from (its `taken_at`),
+        or None when reads go to the database.
+
+        A refresh changes the body without any write, so ETags and cached
+        responses of a board must be keyed by this as well as by its version.
+        """
+        if self._task is None:
+            return None
+        with self._lock:
+            snapshot = self._snapshots.get(board_key)
+        return snapshot.taken_at if snapshot is not None and snapshot.fresh(time.monotonic()) else None
+
+    def forget_project(self, project_id: int) -> None:
+        """Drop a project's snapshots (its bound changed); the next tick reloads them."""
+        with self._lock:
+            for key in [k for k in self._snapshots if k[0] == project_id]:
+                del self._snapshots[key]
+
+    def start(self, loader: SnapshotLoader) -> None:
+        """Start the refresh task (from the event loop, at application startup)."""
+        self._loader = loader
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the refresh task and drop every snapshot."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        with self._lock:
+            self._snapshots.clear()
+            self._last_read.clear()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.TICK)
+            for key in self._due(time.monotonic()):
+                try:
+                    await self._refresh(key)
+                except Exception:
+                    logger.exception("Leaderboard snapshot refresh failed for %s", key)
+
+    def _due(self, now: float) -> list[BoardKey]:
+        """Drop idle boards; return the boards whose snapshot needs a refresh."""
+        due = []
+        with self._lock:
+            for key, last_read in list(self._last_read.items()):
+                if now - last_read > self.idle:
+                    del self._last_read[key]
+                    self._snapshots.pop(key, None)
+                    continue
+                snapshot = self._snapshots.get(key)
+                # Half the bound: a refresh may take a while before it lands.
+                interval = self.idle if snapshot is None or snapshot.max_age is None else snapshot.max_age / 2
+                if snapshot is None or now - snapshot.taken_at >= interval:
+                    due.append(key)
+        return due
+
+    async def _refresh(self, key: BoardKey) -> None:
+        # In a worker thread: building thousands of rows would stall the event loop.
+        snapshot = await asyncio.to_thread(self._load, key)
+        with self._lock:
+            if key in self._last_read:
+                self._snapshots[key] = snapshot
+
+    def _load(self, key: BoardKey) -> _Snapshot:
+        project_id, board = key
+        started = time.monotonic()
+        with SessionLocal() as db:
+            max_age, entries = self._loader(db, project_id, board, self.size)
+        return _Snapshot([sort_key(e) for e in entries], entries, max_age, started)
+
+
+leaderboard_snapshots = LeaderboardSnapshots(
+    size=settings.LEADERBOARD_SNAPSHOT_SIZE,
+    idle=settings.LEADERBOARD_SNAPSHOT_IDLE_SECONDS,
+)
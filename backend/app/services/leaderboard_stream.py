@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import signal
+import threading
+import time
+from typing import NamedTuple
+
+from app.core.config import settings
+from app.crud.projects import leaderboard_async
+from app.db.session import async_session
+from app.services.pubsub import LEADERBOARD_CHANNEL, PubSub, pubsub
+
+logger = logging.getLogger(__name__)
+
+
+class StreamKey(NamedTuple):
+    """One pushed view: every subscriber with the same key shares one query per tick."""
+
+    project_id: int
+    mode: str
+    limit: int
+
+
+# (username, value) rows, in rank order
+Standings = list[tuple[str, int]]
+
+
+class TooManySubscribers(Exception):
+    """Raised when this worker already serves LEADERBOARD_STREAM_MAX_SUBSCRIBERS streams."""
+
+
+class LeaderboardBroadcaster:
+    """
+    Pushes top-N changes to leaderboard subscribers, coalesced per tick.
+
+    - Score writes publish the project id on the pub/sub channel; the handler
+      only marks the project dirty (cheap, any thread).
+    - Every `tick` seconds, one task re-reads each dirty view once (through the
+      usual leaderboard read path, so the in-memory index and caches apply),
+      diffs it against the last standings and fans the diff out to every
+      subscriber queue. A burst of writes costs one query per view per tick,
+      whatever the number of subscribers.
+    - Every `refresh` seconds, all views are re-read even without messages:
+      this bounds staleness when writes land on other workers (the default
+      LocalPubSub does not cross processes).
+
+    Subscriber queues are bounded: a client that falls behind has its queue
+    replaced by a fresh snapshot instead of growing memory.
+    """
+
+    QUEUE_SIZE = 8
+
+    def __init__(self, bus: PubSub, tick: float, refresh: float, max_subscribers: int) -> None:
+        self.bus = bus
+        self.tick = tick
+        self.refresh = refresh
+        self.max_subscribers = max_subscribers
+        self._views: dict[StreamKey, set[asyncio.Queue]] = {}
+        self._standings: dict[StreamKey, Standings] = {}
+        self._loading: dict[StreamKey, asyncio.Future] = {}
+        self._dirty: set[int] = set()
+        self._dirty_lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+        self._unsubscribe = None
+
+    @property
+    def subscribers(self) -> int:
+        return sum(len(queues) for queues in self._views.values())
+
+    async def subscribe(self, key: StreamKey) -> asyncio.Queue:
+        """
+        Register a subscriber. Its queue starts with a ("snapshot", rows) event,
+        followed by ("diff", {...}) events and a final ("close", None).
+
+        Raises:
+            TooManySubscribers: if this worker is at capacity.
+        """
+        if self.subscribers >= self.max_subscribers:
+            raise TooManySubscribers()
+        standings = self._standings.get(key)
+        if standings is None:
+            # Concurrent first subscribers of a view share one initial read.
+            loading = self._loading.get(key)
+            if loading is None:
+                loading = self._loading[key] = asyncio.ensure_future(self._read(key))
+                loading.add_done_callback(lambda _: self._loading.pop(key, None))
+            standings = await asyncio.shield(loading)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.QUEUE_SIZE)
+        queue.put_nowait(("snapshot", _rows(standings)))
+        self._views.setdefault(key, set()).add(queue)
+        self._standings.setdefault(key, standings)
+        self._start()
+        return queue
+
+    def unsubscribe(self, key: StreamKey, queue: asyncio.Queue) -> None:
+        queues = self._views.get(key)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._views[key]
+            self._standings.pop(key, None)
+
+    def on_message(self, message: dict) -> None:
+        """Pub/sub handler: remember that a project changed (any thread)."""
+        with self._dirty_lock:
+            self._dirty.add(message["project_id"])
+
+    def stop_on_exit_signals(self) -> None:
+        """
+        Call `stop()` as soon as the process receives SIGINT / SIGTERM (application startup).
+
+        The server only runs the application's shutdown hooks once every
+        connection is closed, which an open stream never is: the streams must
+        end when the server starts shutting down. The server's own handlers are
+        chained, not replaced. Does nothing outside the main thread (signals
+        cannot be handled there) or when no handler is installed.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            previous = signal.getsignal(sig)
+            if not callable(previous):
+                continue  # default action: the process dies anyway
+
+            def handler(signum, frame, previous=previous) -> None:
+                loop.call_soon_threadsafe(self.stop)
+                previous(signum, frame)
+
+            signal.signal(sig, handler)
+
+    def stop(self) -> None:
+        """Stop the ticker and end every open stream (server shutdown)."""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for queues in self._views.values():
+            for queue in queues:
+                _replace(queue, ("close", None))
+        self._views.clear()
+        self._standings.clear()
+
+    def _start(self) -> None:
+        if self._task is None or self._task.done():
+            if self._unsubscribe is None:
+                self._unsubscribe = self.bus.subscribe(LEADERBOARD_CHANNEL, self.on_message)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        next_refresh = time.monotonic() + self.refresh
+        while self._views:
+            await asyncio.sleep(self.tick)
+            with self._dirty_lock:
+                dirty, self._dirty = self._dirty, set()
+            refresh_all = time.monotonic() >= next_refresh
+            if refresh_all:
+                next_refresh = time.monotonic() + self.refresh
+            for key in [k for k in self._views if refresh_all or k.project_id in dirty]:
+                try:
+                    await self._update(key)
+                except Exception:
+                    logger.exception("Leaderboard stream update failed for %s", key)
+        self._task = None
+
+    async def _update(self, key: StreamKey) -> None:
+        standings = await self._read(key)
+        if key not in self._views:
+            return  # last subscriber left during the query
+        old = self._standings.get(key, [])
+        changed = [
+            {"rank": i + 1, "username": username, "value": value}
+            for i, (username, value) in enumerate(standings)
+            if i >= len(old) or old[i] != (username, value)
+        ]
+        if not changed and len(standings) == len(old):
+            return
+        self._standings[key] = standings
+        event = ("diff", {"size": len(standings), "changed": changed})
+        for queue in self._views[key]:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                _replace(queue, ("snapshot", _rows(standings)))
+
+    async def _read(self, key: StreamKey) -> Standings:
+        async with async_session() as db:
+            rows = await leaderboard_async(db, project_id=key.project_id, limit=key.limit, mode=key.mode)
+        return [(r.username, r.value) for r in rows]
+
+
+def _rows(standings: Standings) -> list[dict]:
+    return [{"rank": i + 1, "username": u, "value": v} for i, (u, v) in enumerate(standings)]
+
+
+def _replace(queue: asyncio.Queue, event: tuple) -> None:
+    """Drop a queue's pending events and leave only `event`."""
+    while not queue.empty():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
+leaderboard_broadcaster = LeaderboardBroadcaster(
+    bus=pubsub,
+    tick=settings.LEADERBOARD_STREAM_TICK_SECONDS,
+    refresh=settings.LEADERBOARD_STREAM_REFRESH_SECONDS,
+    max_subscribers=settings.LEADERBOARD_STREAM_MAX_SUBSCRIBERS,
+)
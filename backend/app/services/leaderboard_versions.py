@@ -0,0 +1,63 @@
+import hashlib
+import secrets
+import threading
+
+
+class LeaderboardVersions:
+    """
+    Per-project leaderboard version counters, bumped on every committed write.
+
+    Used to build strong ETags for leaderboard responses without reading the
+    `scores` table: same (epoch, project, version, query) -> same body.
+
+    - `epoch` is random per process, so an ETag issued by one worker never
+      matches on another worker (or after a restart) and yields a fresh 200.
+    - Versions are process-local: a worker only bumps a project's version for
+      the writes it handled itself, which is why ETag revalidation is opt-in
+      (LEADERBOARD_ETAGS_ENABLED) for multi-worker deployments.
+    """
+
+    def __init__(self) -> None:
+        self.epoch = secrets.token_hex(4)
+        self._versions: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, project_id: int) -> int:
+        return self._versions.get(project_id, 0)
+
+    def bump(self, project_id: int) -> int:
+        with self._lock:
+            version = self._versions.get(project_id, 0) + 1
+            self._versions[project_id] = version
+            return version
+
+    def etag(self, project_id: int, *parts: object) -> str:
+        """
+        Strong ETag for a project's leaderboard representation.
+
+        `parts` must include every query parameter that changes the body
+        (mode, limit, ...). Compute it BEFORE reading the data: if a write lands
+        in between, the body is newer than the tag, which only costs a 200 later.
+        """
+        raw = ":".join(str(p) for p in (self.epoch, project_id, self.get(project_id), *parts))
+        return '"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:24] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against an ETag (weak comparison, RFC 9110).
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+leaderboard_versions = LeaderboardVersions()
@@ -0,0 +1,162 @@
+import threading
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+# Default latency buckets (seconds), from 0.5 ms to 10 s.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labelnames: tuple[str, ...], labels: dict[str, str]) -> tuple[str, ...]:
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[n]) for n in labelnames)
+
+
+def _format_labels(labelnames: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Gauge:
+    """
+    Point-in-time value, read from a callback at render time.
+
+    The callback returns {label values tuple: value}, so one gauge can expose
+    several series (e.g. one per engine) without the caller pushing updates.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        callback: Callable[[], dict[tuple[str, ...], float]],
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.callback = callback
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for key, value in sorted(self.callback().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class _HistogramSeries:
+    __slots__ = ("buckets", "count", "sum", "max")
+
+    def __init__(self, size: int) -> None:
+        self.buckets = [0] * size
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram (Prometheus semantics), optionally split by labels.
+
+    Besides the Prometheus exposition, `summary()` gives count/avg/max and
+    approximate percentiles (bucket upper bounds) for JSON health endpoints.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.bounds = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(self.labelnames, labels)
+        # Index of the first bucket whose upper bound is >= value (+Inf if none).
+        idx = bisect_left(self.bounds, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.bounds) + 1)
+            series.buckets[idx] += 1
+            series.count += 1
+            series.sum += value
+            if value > series.max:
+                series.max = value
+
+    def summary(self, **labels: str) -> dict:
+        """count, avg, max and approximate p50/p95/p99 for one series."""
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None or series.count == 0:
+                return {"count": 0}
+            buckets = list(series.buckets)
+            count, total, peak = series.count, series.sum, series.max
+
+        def percentile(pct: float) -> float:
+            target = pct / 100 * count
+            seen = 0
+            for i, n in enumerate(buckets):
+                seen += n
+                if seen >= target:
+                    return self.bounds[i] if i < len(self.bounds) else peak
+            return peak
+
+        return {
+            "count": count,
+            "avg": total / count,
+            "max": peak,
+            "p50": percentile(50),
+            "p95": percentile(95),
+            "p99": percentile(99),
+        }
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            for key, series in items:
+                cumulative = 0
+                for bound, n in zip(self.bounds + (float("inf"),), series.buckets):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series.sum}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series.count}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics rendered together in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Gauge | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
@@ -0,0 +1,78 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.security import hash_password, verify_and_update_password
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hashes are already pending."""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt off the request threads, with load shedding.
+
+    - With `workers > 0`, hashes run in a dedicated process pool: bcrypt CPU
+      time no longer competes with the threadpool serving other routes, and
+      `workers` caps the cores spent on it. The pool uses the "spawn" start
+      method (forking a process that already runs threads is unsafe) and is
+      created on first use.
+    - With `workers == 0`, hashes run in the regular threadpool.
+    - At most `max_pending` hashes may be running or queued; beyond that,
+      calls fail fast with PasswordHasherBusy instead of queueing behind a
+      login flood.
+
+    Must be called from the event loop (the pending counter is not locked).
+    """
+
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._executor: Executor | None = None
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        """See app.core.security.verify_and_update_password()."""
+        return await self._run(verify_and_update_password, password, hashed)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            raise PasswordHasherBusy()
+        self.pending += 1
+        try:
+            if self.workers <= 0:
+                return await run_in_threadpool(fn, *args)
+            return await asyncio.get_running_loop().run_in_executor(self._pool(), partial(fn, *args))
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed): start a fresh pool next time.
+            self.shutdown()
+            raise
+        finally:
+            self.pending -= 1
+
+    def _pool(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
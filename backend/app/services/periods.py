@@ -0,0 +1,39 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Literal
+
+# Time-windowed leaderboard periods. Buckets are aligned on UTC boundaries.
+Period = Literal["daily", "weekly"]
+PERIODS: tuple[Period, ...] = ("daily", "weekly")
+
+
+def period_start(period: Period, ts: datetime | None = None) -> date:
+    """
+    First day (UTC) of the bucket containing `ts` (default: now).
+
+    - daily: the day itself
+    - weekly: the Monday of the ISO week
+
+    Naive datetimes are taken as UTC (SQLite returns CURRENT_TIMESTAMP that way).
+    """
+    if ts is None:
+        ts = datetime.now(timezone.utc)
+    elif ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc)
+    day = ts.date()
+    if period == "daily":
+        return day
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Unknown period: {period}")
+
+
+def board_name(mode: str, ts: datetime | None = None) -> str:
+    """
+    Name of the board currently backing a leaderboard mode.
+
+    Windowed modes get the bucket in their name ("daily:2026-10-18"), so a
+    rollover switches to a fresh board in every cache keyed by it.
+    """
+    if mode in PERIODS:
+        return f"{mode}:{period_start(mode, ts).isoformat()}"
+    return mode
@@ -0,0 +1,68 @@
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Channel carrying {"project_id": int} after every committed score write.
+LEADERBOARD_CHANNEL = "leaderboard"
+
+Handler = Callable[[dict], None]
+
+
+class PubSub(ABC):
+    """
+    Minimal publish/subscribe interface used to fan events out to listeners.
+
+    Messages are small JSON-serializable dicts, so a networked implementation
+    (Redis pub/sub, PostgreSQL LISTEN/NOTIFY...) can carry them between
+    uvicorn workers. Handlers must be cheap and thread-safe: they may run on
+    the publisher's thread (or on the implementation's receiver thread).
+    """
+
+    @abstractmethod
+    def publish(self, channel: str, message: dict) -> None:
+        """Deliver `message` to the handlers subscribed to `channel`."""
+
+    @abstractmethod
+    def subscribe(self, channel: str, handler: Handler) -> Callable[[], None]:
+        """Register `handler` for `channel`. Returns a function that unsubscribes it."""
+
+
+class LocalPubSub(PubSub):
+    """
+    In-process stand-in: delivers synchronously to handlers of this worker only.
+
+    With several workers, each one only hears about the writes it handled
+    itself; listeners must tolerate missed messages (see the periodic refresh
+    of the leaderboard broadcaster).
+    """
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, list[Handler]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: dict) -> None:
+        with self._lock:
+            handlers = list(self._handlers.get(channel, ()))
+        for handler in handlers:
+            try:
+                handler(message)
+            except Exception:
+                logger.exception("Pub/sub handler failed on channel %s", channel)
+
+    def subscribe(self, channel: str, handler: Handler) -> Callable[[], None]:
+        with self._lock:
+            self._handlers.setdefault(channel, []).append(handler)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                handlers = self._handlers.get(channel, [])
+                if handler in handlers:
+                    handlers.remove(handler)
+
+        return unsubscribe
+
+
+pubsub: PubSub = LocalPubSub()
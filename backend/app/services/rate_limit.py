@@ -0,0 +1,171 @@
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import NamedTuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimit(NamedTuple):
+    """Token bucket parameters: refill `rate` tokens per second, hold at most `burst`."""
+
+    rate: float
+    burst: int
+
+
+class RateDecision(NamedTuple):
+    """
+    Outcome of one rate-limited request.
+
+    - limit / remaining: bucket capacity and whole tokens left (RateLimit-Limit / -Remaining)
+    - reset: seconds until the bucket is full again (RateLimit-Reset)
+    - retry_after: seconds until the request would be allowed (0 when allowed)
+    """
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: float
+    retry_after: float
+
+
+def _decide(allowed: bool, tokens: float, limit: RateLimit, cost: int) -> RateDecision:
+    """Build the decision from the bucket level left after the request."""
+    needed = min(cost, limit.burst)
+    return RateDecision(
+        allowed=allowed,
+        limit=limit.burst,
+        remaining=max(0, math.floor(tokens)),
+        reset=max(0.0, (limit.burst - tokens) / limit.rate),
+        retry_after=0.0 if allowed else (needed - tokens) / limit.rate,
+    )
+
+
+class RateLimiter(ABC):
+    """
+    Token-bucket rate limiter interface, one bucket per key.
+
+    A request costing `cost` tokens is allowed when the bucket holds at least
+    `cost` tokens, or is full (a request larger than the burst is let through
+    on a full bucket and leaves it in debt, so it is never starved). Refused
+    requests consume nothing.
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateDecision:
+        """Take `cost` tokens from the bucket of `key` if the request is allowed."""
+
+    async def close(self) -> None:
+        """Release backend resources (application shutdown)."""
+
+
+class LocalRateLimiter(RateLimiter):
+    """
+    In-process stand-in: buckets live in this worker's memory (no I/O).
+
+    With several workers each one enforces the limit on its own, so a client
+    spread across N workers gets up to N times the configured rate. At most
+    `max_buckets` buckets are kept; the least recently used is forgotten
+    first (it starts full again if the key comes back).
+    """
+
+    def __init__(self, max_buckets: int) -> None:
+        self.max_buckets = max_buckets
+        # key -> (tokens, monotonic time of the last update)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateDecision:
+        return self.take(key, limit, cost)
+
+    def take(self, key: str, limit: RateLimit, cost: int = 1) -> RateDecision:
+        """Synchronous version of hit() (never blocks on I/O)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (limit.burst, now))
+            tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+            allowed = tokens >= min(cost, limit.burst)
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return _decide(allowed, tokens, limit, cost)
+
+
+# Same arithmetic as LocalRateLimiter.take(), atomic on the Redis server.
+# Clock: the server's (TIME), so workers need not agree on the time.
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= math.min(cost, burst) then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil((burst - tokens) / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimiter(RateLimiter):
+    """
+    Buckets shared by every worker through Redis (one round trip per request).
+
+    Requires the optional `redis` package. When Redis fails, the request is
+    decided by a LocalRateLimiter instead of being rejected: the limit
+    degrades to per-worker buckets rather than taking submissions down.
+    """
+
+    KEY_PREFIX = "scoreforge:ratelimit:"
+    # Seconds between two "backend unavailable" warnings.
+    WARN_INTERVAL = 10.0
+
+    def __init__(self, url: str, fallback: LocalRateLimiter) -> None:
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL requires the `redis` package (pip install redis)") from e
+        self.errors = (redis.RedisError, OSError)
+        self.client = redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self.script = self.client.register_script(_TOKEN_BUCKET_LUA)
+        self.fallback = fallback
+        self._warned_at = float("-inf")
+
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateDecision:
+        try:
+            allowed, tokens = await self.script(keys=[self.KEY_PREFIX + key], args=[limit.rate, limit.burst, cost])
+        except self.errors as e:
+            now = time.monotonic()
+            if now - self._warned_at >= self.WARN_INTERVAL:
+                self._warned_at = now
+                logger.warning("Rate limit backend unavailable, using local buckets: %s", e)
+            return self.fallback.take(key, limit, cost)
+        return _decide(bool(allowed), float(tokens), limit, cost)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def _build_rate_limiter() -> RateLimiter:
+    local = LocalRateLimiter(max_buckets=settings.RATE_LIMIT_LOCAL_MAX_BUCKETS)
+    if settings.RATE_LIMIT_REDIS_URL:
+        return RedisRateLimiter(settings.RATE_LIMIT_REDIS_URL, fallback=local)
+    return local
+
+
+rate_limiter = _build_rate_limiter()
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable, NamedTuple
+
+from app.core.config import settings
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    # Response headers that depend on the body (e.g. the next page cursor).
+    headers: dict[str, str]
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+
+class ResponseCache:
+    """
+    Byte-bounded LRU cache of pre-serialized response bodies, grouped by project.
+
+    - Keys are (project_id, ...query parts); values are JSON bytes plus the
+      headers derived from them.
+    - Each entry records the project's leaderboard version it was built from;
+      a lookup with a different current version is a miss. This makes the
+      read-then-store race safe: a body computed before a write cannot be
+      served after that write.
+    - `invalidate_project()` drops a project's entries eagerly (frees memory
+      as soon as a write lands, instead of waiting for LRU eviction).
+    - Entries also expire after `ttl` seconds, which bounds staleness across
+      workers (invalidations and versions are process-local).
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, enabled: bool = True) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = enabled
+        self._entries: OrderedDict[tuple, tuple[int, float, CachedResponse]] = OrderedDict()
+        self._by_project: dict[int, set[tuple]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, project_id: int, key: tuple[Hashable, ...], version: int) -> CachedResponse | None:
+        if not self.enabled:
+            return None
+        full_key = (project_id, *key)
+        with self._lock:
+            item = self._entries.get(full_key)
+            if item is None:
+                return None
+            entry_version, expires_at, cached = item
+            if entry_version != version or expires_at <= time.monotonic():
+                self._drop(full_key)
+                return None
+            self._entries.move_to_end(full_key)
+            return cached
+
+    def set(
+        self,
+        project_id: int,
+        key: tuple[Hashable, ...],
+        version: int,
+        body: bytes,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        cached = CachedResponse(body, headers or {})
+        if not self.enabled or cached.size > self.max_bytes:
+            return
+        full_key = (project_id, *key)
+        with self._lock:
+            if full_key in self._entries:
+                self._drop(full_key)
+            self._entries[full_key] = (version, time.monotonic() + self.ttl, cached)
+            self._by_project.setdefault(project_id, set()).add(full_key)
+            self._bytes += cached.size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+
+    def invalidate_project(self, project_id: int) -> None:
+        with self._lock:
+            for full_key in list(self._by_project.get(project_id, ())):
+                self._drop(full_key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_project.clear()
+            self._bytes = 0
+
+    def _drop(self, full_key: tuple) -> None:
+        # Caller holds the lock.
+        _, _, cached = self._entries.pop(full_key)
+        self._bytes -= cached.size
+        keys = self._by_project.get(full_key[0])
+        if keys is not None:
+            keys.discard(full_key)
+            if not keys:
+                del self._by_project[full_key[0]]
+
+
+leaderboard_responses = ResponseCache(
+    max_bytes=settings.LEADERBOARD_RESPONSE_CACHE_MAX_BYTES,
+    ttl=settings.LEADERBOARD_RESPONSE_CACHE_TTL_SECONDS,
+    enabled=settings.LEADERBOARD_RESPONSE_CACHE_ENABLED,
+)
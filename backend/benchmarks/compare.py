@@ -0,0 +1,77 @@
+"""
+Compare two benchmark result files (JSON written by `benchmarks.http_load`).
+
+Prints req/s and latency percentiles side by side with the relative change,
+and flags regressions larger than --threshold percent (lower req/s, higher
+latency). Exits with status 1 if any regression is flagged, so it can gate CI.
+
+Usage (from the backend/ directory):
+
+    python -m benchmarks.compare benchmarks/results/base.json benchmarks/results/new.json
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# (label, path in a scenario result, True if higher is better)
+METRICS = (
+    ("req/s", ("rps",), True),
+    ("p50 ms", ("latency_ms", "p50"), False),
+    ("p95 ms", ("latency_ms", "p95"), False),
+    ("p99 ms", ("latency_ms", "p99"), False),
+)
+
+
+def _get(result: dict, path: tuple[str, ...]) -> float:
+    for key in path:
+        result = result[key]
+    return result
+
+
+def _describe(report: dict) -> str:
+    git = report.get("git") or {}
+    commit = (git.get("commit") or "?")[:8] + ("+dirty" if git.get("dirty") else "")
+    env = report.get("environment", {})
+    return f"{commit} {report.get('created_at', '?')} ({env.get('database', '?')}, {env.get('transport', '?')})"
+
+
+def compare(base: dict, new: dict, threshold: float) -> list[str]:
+    """Print the comparison table; return the regressions found."""
+    print(f"base: {_describe(base)}")
+    print(f"new:  {_describe(new)}")
+    if base.get("parameters") != new.get("parameters"):
+        print("warning: the runs used different parameters")
+
+    regressions = []
+    print(f"{'scenario':<12} {'metric':<7} {'base':>10} {'new':>10} {'change':>8}")
+    for scenario in [name for name in base["scenarios"] if name in new["scenarios"]]:
+        for label, path, higher_is_better in METRICS:
+            old_value = _get(base["scenarios"][scenario], path)
+            new_value = _get(new["scenarios"][scenario], path)
+            change = (new_value - old_value) / old_value * 100 if old_value else 0.0
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSION" if worse > threshold else ""
+            if flag:
+                regressions.append(f"{scenario} {label}")
+            print(f"{scenario:<12} {label:<7} {old_value:>10.2f} {new_value:>10.2f} {change:>+7.1f}%{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", type=Path, help="Reference results.")
+    parser.add_argument("new", type=Path, help="Results to check.")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent.")
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text())
+    new = json.loads(args.new.read_text())
+    regressions = compare(base, new, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Throughput and latency of the HTTP hot paths.
+
+Seeds --projects projects (one API key each) and --scores scores, then drives
+the application built by `create_app()` with --concurrency concurrent clients,
+one scenario after the other:
+
+- submit: POST /scores/submit (random project, player and value)
+- leaderboard: GET /scores/leaderboard/{project_id} (random project and mode)
+- login: POST /auth/login (bcrypt, so fewer requests by default)
+- keys: API key resolution alone (`require_project_from_api_key` behind a
+  benchmark-only route)
+
+Requests go through httpx's ASGI transport by default: no network, but client
+and server share one event loop, so compare runs with each other rather than
+reading the numbers as server capacity. With --url, the same load is sent to a
+running server instead (which must use the same DATABASE_URL; the `keys`
+scenario is skipped).
+
+Each run reports req/s and p50/p95/p99 per scenario and writes a JSON file
+(parameters, settings, git commit) to diff with `python -m benchmarks.compare`.
+
+Usage (from the backend/ directory, against a SCRATCH database):
+
+    python -m benchmarks.http_load --projects 20 --scores 100000
+    python -m benchmarks.http_load --database-url sqlite:///./bench.db --scenarios submit leaderboard
+
+The benchmark creates its own user/projects and deletes them at the end
+(unless --keep is passed). Without --database-url it reads DATABASE_URL like
+the application does. Score submissions are not rate limited unless
+--rate-limit is passed.
+
+App modules are imported inside functions: settings are read at import time,
+after main() has set up the environment.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import secrets
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+
+SCENARIOS = ("submit", "leaderboard", "login", "keys")
+RESULTS_DIR = Path(__file__).parent / "results"
+SEED_CHUNK = 5_000
+PASSWORD = "bench-password"
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def _git_state() -> dict:
+    def git(*cmd: str) -> str:
+        return subprocess.run(["git", *cmd], capture_output=True, text=True, cwd=Path(__file__).parent).stdout.strip()
+
+    try:
+        return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--", "."))}
+    except OSError:
+        return {"commit": None, "dirty": None}
+
+
+def _settings_snapshot(settings) -> dict:
+    """Settings that shape the results (connection strings and secrets left out)."""
+    return {k: v for k, v in settings.model_dump().items() if "URL" not in k and "SECRET" not in k}
+
+
+class Fixture:
+    """Scratch user, projects, API keys and scores, tagged to be deleted afterwards."""
+
+    def __init__(self, args) -> None:
+        from app.core.security import hash_password
+        from app.crud.projects import create_api_key, insert_scores
+        from app.db.session import SessionLocal
+        from app.models import Project, User
+        from app.schemas.scores import ScoreSubmit
+
+        self.tag = secrets.token_hex(4)
+        self.username = f"bench_{self.tag}"
+        db = SessionLocal()
+        try:
+            owner = User(
+                username=self.username,
+                email=f"{self.username}@example.com",
+                hashed_password=hash_password(PASSWORD),
+            )
+            db.add(owner)
+            db.commit()
+            self.owner_id = owner.id
+            projects = [Project(name=f"bench-{self.tag}-{i}", owner_id=owner.id) for i in range(args.projects)]
+            db.add_all(projects)
+            db.commit()
+            self.project_ids = [p.id for p in projects]
+            self.api_keys = [create_api_key(db, pid)[0] for pid in self.project_ids]
+
+            remaining = args.scores
+            while remaining > 0:
+                n = min(SEED_CHUNK, remaining)
+                pid = random.choice(self.project_ids)
+                batch = [
+                    ScoreSubmit(
+                        username=f"player{random.randrange(args.players):06d}", value=random.randrange(1_000_000)
+                    )
+                    for _ in range(n)
+                ]
+                insert_scores(db, pid, batch)
+                db.commit()
+                remaining -= n
+        finally:
+            db.close()
+
+    def delete(self) -> None:
+        from sqlalchemy import delete
+
+        from app.db.session import SessionLocal
+        from app.models import (
+            ApiKey,
+            BestScore,
+            BestScoreBucket,
+            PeriodBestScore,
+            Project,
+            Score,
+            ScoreIdempotencyKey,
+            User,
+        )
+
+        db = SessionLocal()
+        try:
+            for table in (Score, BestScore, BestScoreBucket, PeriodBestScore, ScoreIdempotencyKey, ApiKey):
+                db.execute(delete(table).where(table.project_id.in_(self.project_ids)))
+            db.execute(delete(Project).where(Project.id.in_(self.project_ids)))
+            db.execute(delete(User).where(User.id == self.owner_id))
+            db.commit()
+        finally:
+            db.close()
+
+
+def _requests(scenario: str, fixture: Fixture, args):
+    """Return a function building the next (method, url, httpx kwargs) of a scenario."""
+    targets = list(zip(fixture.project_ids, fixture.api_keys))
+
+    if scenario == "submit":
+        def make():
+            _, key = random.choice(targets)
+            body = {"username": f"player{random.randrange(args.players):06d}", "value": random.randrange(1_000_000)}
+            return "POST", "/scores/submit", {"json": body, "headers": {"X-API-Key": key}}
+    elif scenario == "leaderboard":
+        def make():
+            pid, _ = random.choice(targets)
+            params = {"limit": args.limit, "mode": random.choice(args.modes)}
+            return "GET", f"/scores/leaderboard/{pid}", {"params": params}
+    elif scenario == "login":
+        def make():
+            form = {"username": fixture.username, "password": PASSWORD}
+            return "POST", "/auth/login", {"data": form}
+    elif scenario == "keys":
+        def make():
+            _, key = random.choice(targets)
+            return "GET", "/_bench/project", {"headers": {"X-API-Key": key}}
+    else:
+        raise ValueError(f"Unknown scenario: {scenario}")
+    return make
+
+
+async def _drive(client, make, total: int, concurrency: int) -> dict:
+    """Send `total` requests from `concurrency` clients; return throughput and latency stats."""
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    pending = iter(range(total))
+
+    async def client_loop() -> None:
+        for _ in pending:
+            method, url, kwargs = make()
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    errors = sum(n for status, n in statuses.items() if not status.startswith("2"))
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "status": dict(sorted(statuses.items())),
+        "seconds": round(elapsed, 4),
+        "rps": round(total / elapsed, 2),
+        "latency_ms": {
+            "mean": round(sum(latencies) / len(latencies), 3),
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "p99": round(_percentile(latencies, 99), 3),
+            "max": round(max(latencies), 3),
+        },
+    }
+
+
+async def _run_scenarios(app, fixture: Fixture, args) -> dict:
+    import httpx
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        # App exceptions become 500 responses, as behind a real server.
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        client = httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60)
+
+    results = {}
+    async with client:
+        for scenario in args.scenarios:
+            make = _requests(scenario, fixture, args)
+            total = args.login_requests if scenario == "login" else args.requests
+            warmup = min(args.warmup, total)
+            if warmup:
+                await _drive(client, make, warmup, args.concurrency)
+            results[scenario] = stats = await _drive(client, make, total, args.concurrency)
+            latency = stats["latency_ms"]
+            print(
+                f"{scenario:<12} {stats['rps']:>10.1f} {latency['p50']:>9.2f} {latency['p95']:>9.2f} "
+                f"{latency['p99']:>9.2f} {stats['errors']:>7}"
+            )
+    return results
+
+
+def _build_app():
+    """The application under test, plus a route exposing API key resolution alone."""
+    from fastapi import Depends
+
+    from app.api.deps import require_project_from_api_key
+    from app.main import create_app
+
+    app = create_app()
+
+    async def resolve_project(project=Depends(require_project_from_api_key)) -> dict:
+        return {"id": project.id}
+
+    app.add_api_route("/_bench/project", resolve_project, methods=["GET"], include_in_schema=False)
+    return app
+
+
+async def _serve(app, fixture: Fixture, args) -> dict:
+    if args.url:
+        return await _run_scenarios(None, fixture, args)
+    # Run the startup/shutdown hooks (ingestion worker, pools...) around the load.
+    async with app.router.lifespan_context(app):
+        return await _run_scenarios(app, fixture, args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Scratch database (default: DATABASE_URL).")
+    parser.add_argument("--url", help="Load a running server at this base URL instead of the in-process app.")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--projects", type=int, default=10, help="Projects (one API key each).")
+    parser.add_argument("--scores", type=int, default=50_000, help="Scores seeded before the run.")
+    parser.add_argument("--players", type=int, default=10_000, help="Distinct player names.")
+    parser.add_argument("--requests", type=int, default=2_000, help="Timed requests per scenario.")
+    parser.add_argument("--login-requests", type=int, default=100, help="Timed requests for `login`.")
+    parser.add_argument("--warmup", type=int, default=50, help="Untimed requests before each scenario.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients.")
+    parser.add_argument("--limit", type=int, default=20, help="Leaderboard page size.")
+    parser.add_argument("--modes", nargs="+", default=["all", "best"], help="Leaderboard modes to mix.")
+    parser.add_argument("--rate-limit", action="store_true", help="Keep score submission rate limiting on.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (same seed, same data and requests).")
+    parser.add_argument("--output", type=Path, help="JSON results file (default: benchmarks/results/...).")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded rows.")
+    args = parser.parse_args()
+    if args.url and "keys" in args.scenarios:
+        args.scenarios.remove("keys")
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("JWT_SECRET", secrets.token_urlsafe(32))
+    if not args.rate_limit:
+        os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    from app import models  # noqa: F401  (ensures model metadata is registered)
+    from app.core.config import settings
+    from app.db.base import Base
+    from app.db.session import engine
+
+    random.seed(args.seed)
+    Base.metadata.create_all(bind=engine)
+    app = None if args.url else _build_app()
+
+    print(f"seeding {args.projects} projects, {args.scores} scores ({engine.dialect.name})...")
+    fixture = Fixture(args)
+    print(f"{'scenario':<12} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    try:
+        results = asyncio.run(_serve(app, fixture, args))
+    finally:
+        if not args.keep:
+            fixture.delete()
+
+    report = {
+        "benchmark": "http_load",
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git": _git_state(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "database": engine.dialect.name,
+            "transport": args.url or "asgi",
+        },
+        "parameters": {k: v for k, v in vars(args).items() if k not in ("database_url", "url", "output", "keep")},
+        "settings": _settings_snapshot(settings),
+        "scenarios": results,
+    }
+    output = args.output
+    if output is None:
+        commit = (report["git"]["commit"] or "nogit")[:8]
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        output = RESULTS_DIR / f"http_load-{commit}-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str) + "\n")
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Leaderboard latency vs. table size.
+
+Seeds the `scores` table in steps and, after each step, measures the latency of
+`crud.projects.leaderboard()` (database path, in-memory index disabled).
+With ix_scores_leaderboard in place, p99 should stay flat as the table grows;
+without it, it grows with the table (sequential scan + sort).
+
+Usage (from the backend/ directory, against a SCRATCH database):
+
+    python -m benchmarks.leaderboard_scaling --sizes 10000 100000 1000000
+
+The benchmark creates its own user/projects and deletes them at the end
+(unless --keep is passed). It reads DATABASE_URL like the application does.
+"""
+import argparse
+import random
+import secrets
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, insert, select, text
+
+from app import models  # noqa: F401  (ensures model metadata is registered)
+from app.crud.projects import leaderboard
+from app.db.base import Base
+from app.db.session import SessionLocal, engine
+from app.models import Project, Score, User
+from app.services.leaderboard_index import leaderboard_index
+
+CHUNK = 10_000
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+def _seed(db, project_ids: list[int], count: int) -> None:
+    """Insert `count` random scores spread across `project_ids`."""
+    now = datetime.now(timezone.utc)
+    while count > 0:
+        n = min(CHUNK, count)
+        rows = [
+            {
+                "project_id": random.choice(project_ids),
+                "username": f"player{random.randrange(100_000):05d}",
+                "value": random.randrange(1_000_000),
+                "created_at": now - timedelta(seconds=random.randrange(90 * 86400)),
+            }
+            for _ in range(n)
+        ]
+        db.execute(insert(Score), rows)
+        db.commit()
+        count -= n
+
+
+def _analyze() -> None:
+    """Refresh planner stats (and the visibility map needed for index-only scans)."""
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM (ANALYZE) scores"))
+    elif engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+
+def _plan(db, project_id: int, limit: int) -> str:
+    if engine.dialect.name != "postgresql":
+        return "-"
+    rows = db.execute(
+        text(
+            "EXPLAIN SELECT id, username, value, created_at FROM scores "
+            "WHERE project_id = :pid ORDER BY value DESC, created_at DESC, id DESC LIMIT :lim"
+        ),
+        {"pid": project_id, "lim": limit},
+    ).scalars().all()
+    return next((r.strip() for r in rows if "Scan" in r), rows[0].strip())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000],
+                        help="Total benchmark rows after each step.")
+    parser.add_argument("--projects", type=int, default=10, help="Projects sharing the rows.")
+    parser.add_argument("--limit", type=int, default=20, help="Leaderboard page size.")
+    parser.add_argument("--iterations", type=int, default=500, help="Timed reads per step.")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded rows.")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    leaderboard_index.enabled = False
+
+    db = SessionLocal()
+    tag = secrets.token_hex(4)
+    owner = User(username=f"bench_{tag}", email=f"bench_{tag}@example.com", hashed_password="-")
+    db.add(owner)
+    db.commit()
+    projects = [Project(name=f"bench-{tag}-{i}", owner_id=owner.id) for i in range(args.projects)]
+    db.add_all(projects)
+    db.commit()
+    project_ids = [p.id for p in projects]
+    target = project_ids[0]
+
+    print(f"{'rows':>12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}  plan")
+    seeded = 0
+    try:
+        for size in sorted(args.sizes):
+            _seed(db, project_ids, size - seeded)
+            seeded = size
+            _analyze()
+
+            for _ in range(min(20, args.iterations)):
+                leaderboard(db, target, args.limit)
+
+            samples = []
+            for _ in range(args.iterations):
+                start = time.perf_counter()
+                leaderboard(db, target, args.limit)
+                samples.append((time.perf_counter() - start) * 1000)
+
+            print(
+                f"{size:>12} {statistics.median(samples):>9.3f} {_percentile(samples, 95):>9.3f} "
+                f"{_percentile(samples, 99):>9.3f}  {_plan(db, target, args.limit)}"
+            )
+    finally:
+        if not args.keep:
+            db.rollback()
+            db.execute(delete(Score).where(Score.project_id.in_(project_ids)))
+            db.execute(delete(Project).where(Project.id.in_(project_ids)))
+            db.execute(delete(User).where(User.id == owner.id))
+            db.commit()
+        total = db.execute(select(func.count()).select_from(Score)).scalar_one()
+        db.close()
+        print(f"scores table now has {total} rows")
+
+
+if __name__ == "__main__":
+    main()